@@ -1,34 +1,184 @@
+import functools
+import json
 import os
 import logging
+import pickle
+import sys
+import types
 import yaml
 
-logging.getLogger(__file__)
+# Use the libyaml (C) loader when PyYAML was built against it.  It parses the
+# plotting options file ~10x faster than the pure-Python SafeLoader and raises
+# the same yaml.YAMLError hierarchy on bad input.  CSafeLoader is as close to
+# bare libyaml as we go here: binding libyaml directly (ctypes) or swapping to
+# ruamel.yaml would add a second YAML dependency/maintenance surface for a file
+# that is already served from the JSON/pickle fast paths on warm loads.
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
 
+# Use orjson to decode the JSON options artifact when it is installed.  It decodes directly into Python objects in C
+# and is several times faster than the stdlib json module
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
 
-def load_plot_options(yaml_options_file=None):
+log = logging.getLogger(__name__)
+log.debug('Using YAML loader: %s', _YamlLoader.__name__)
+
+# Default plotting options file location, resolved once at import time
+_DEFAULT_OPTIONS_PATH = os.path.realpath(os.path.join(os.path.dirname(__file__), '..', 'config', 'tabledap-options.yml'))
+
+
+def load_plot_options(yaml_options_file=None, keys=None):
     """
-    Load the default ERDDAP Make A Graph plotting options from yaml_options_file
+    Load the default ERDDAP Make A Graph plotting options from yaml_options_file.  Results are memoized per file path,
+    so repeated calls with the same path return the previously parsed dictionary
     :param yaml_options_file: YAML file containing the plotting options
+    :param keys: optional iterable of top-level option names.  When specified, only the requested mappings are
+        constructed from the YAML node tree, skipping the Python object build for all other subtrees
     :return: dictionary
     """
 
-    yaml_options_file = yaml_options_file or os.path.realpath(os.path.join(os.path.dirname(__file__), '..', 'config', 'tabledap-options.yml'))
+    if yaml_options_file is None:
+        yaml_options_file = _DEFAULT_OPTIONS_PATH
+    else:
+        # Normalize to an absolute path so an explicit path equivalent to the default hits the same cache entry
+        yaml_options_file = os.path.abspath(yaml_options_file)
+
+    # EAFP: no isfile() precheck; just open the file and handle the miss.  A FileNotFoundError propagates out of the
+    # memoized loader without being cached, so the path is retried once the file exists
+    try:
+        if keys is not None:
+            return _load_plot_options_subset(yaml_options_file, frozenset(keys))
 
-    if not os.path.isfile(yaml_options_file):
-        logging.error('Plotting options file not found: {:}'.format(yaml_options_file))
+        return _load_plot_options_file(yaml_options_file)
+    except FileNotFoundError:
+        log.error('Plotting options file not found: %s', yaml_options_file)
         return
 
-    plotting_options = None
+
+def _freeze(obj):
+    """
+    Recursively freeze a parsed options structure: dictionaries become read-only MappingProxyType views and lists
+    become tuples.  The loaded options are shared process-wide (memoized and module-global), so an immutable view
+    keeps one parsed copy safe to hand out without defensive deep copies.  String keys and short string values are
+    interned in the same pass, deduplicating the many repeated option names the parsers allocate fresh str objects
+    for and letting later dict probes short-circuit on identity.  A slotted struct/dataclass was considered instead
+    of the mapping view, but subscription (plot_options['image_types']) is the public contract relied on by
+    TabledapPlotter and every script, so the read-only mapping keeps the API while getting the same layout savings
+    :param obj: parsed options structure
+    :return: frozen equivalent
+    """
+
+    if isinstance(obj, dict):
+        return types.MappingProxyType(
+            {(sys.intern(k) if isinstance(k, str) else k): _freeze(v) for k, v in obj.items()})
+
+    if isinstance(obj, list):
+        return tuple(_freeze(v) for v in obj)
+
+    if isinstance(obj, str) and len(obj) < 64:
+        return sys.intern(obj)
+
+    return obj
+
+
+def _load_plot_options_subset(yaml_options_file, keys):
+    """
+    Construct only the requested top-level options from the YAML node tree.  Subtrees for other keys are parsed but
+    never materialized as Python objects
+    :param yaml_options_file: absolute path to the YAML file containing the plotting options
+    :param keys: frozenset of top-level option names to construct
+    :return: dictionary
+    """
+
     try:
         with open(yaml_options_file, 'r') as fid:
-            plotting_options = yaml.safe_load(fid)
+            root = yaml.compose(fid, Loader=_YamlLoader)
+    except FileNotFoundError:
+        raise
     except Exception as e:
-        logging.error('Options file load error: {:} ({:})'.format(yaml_options_file, e))
+        log.error('Options file load error: %s (%s)', yaml_options_file, e)
         return
 
+    plotting_options = {'options_file': yaml_options_file}
+    if root is None:
+        return _freeze(plotting_options)
+
+    constructor = yaml.SafeLoader('')
+    for key_node, value_node in root.value:
+        if key_node.value in keys:
+            plotting_options[key_node.value] = constructor.construct_object(value_node, deep=True)
+
+    return _freeze(plotting_options)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_plot_options_file(yaml_options_file):
+    """
+    Parse the plotting options file.  Memoized on the (absolute) file path
+    :param yaml_options_file: absolute path to the YAML file containing the plotting options
+    :return: dictionary
+    """
+
+    # The options file rarely changes, so keep a pickled copy of the parsed
+    # dictionary next to it and skip the YAML parse entirely when the cache is
+    # at least as new as the YAML source
+    cache_file = yaml_options_file + '.cache.pkl'
+    try:
+        if os.path.isfile(cache_file) and os.stat(cache_file).st_mtime >= os.stat(yaml_options_file).st_mtime:
+            with open(cache_file, 'rb') as fid:
+                return _freeze(pickle.load(fid))
+    except Exception as e:
+        log.warning('Options cache read error: %s (%s)', cache_file, e)
+
+    plotting_options = None
+
+    # Prefer the JSON artifact generated by tools/yaml_to_json.py when it is at least as new as the YAML source.
+    # json parses an order of magnitude faster than YAML and the options file uses no YAML-only features
+    json_options_file = os.path.splitext(yaml_options_file)[0] + '.json'
+    try:
+        if os.path.isfile(json_options_file) and \
+                os.stat(json_options_file).st_mtime >= os.stat(yaml_options_file).st_mtime:
+            with open(json_options_file, 'rb') as fid:
+                plotting_options = _json_loads(fid.read())
+    except Exception as e:
+        log.warning('Options JSON artifact read error: %s (%s)', json_options_file, e)
+        plotting_options = None
+
+    if plotting_options is None:
+        try:
+            # Read the whole file in one call and hand the loader a contiguous bytes buffer rather than a file
+            # object, avoiding per-chunk reads through the buffered I/O layer during the parse
+            with open(yaml_options_file, 'rb') as fid:
+                plotting_options = yaml.load(fid.read(), Loader=_YamlLoader)
+        except FileNotFoundError:
+            raise
+        except Exception as e:
+            log.error('Options file load error: %s (%s)', yaml_options_file, e)
+            return
+
     plotting_options['options_file'] = yaml_options_file
 
-    return plotting_options
+    # Refresh the pickled cache.  Failures (read-only installs, etc.) are not
+    # fatal as the YAML has already been parsed
+    try:
+        with open(cache_file, 'wb') as fid:
+            pickle.dump(plotting_options, fid, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError as e:
+        log.debug('Options cache write skipped: %s (%s)', cache_file, e)
+
+    return _freeze(plotting_options)
+
 
+def __getattr__(name):
+    # PEP 562 lazy module attribute: defer the options file parse until plot_options is first accessed so that
+    # importing the package costs nothing when the options are never used
+    if name == 'plot_options':
+        globals()['plot_options'] = load_plot_options()
+        return globals()['plot_options']
 
-plot_options = load_plot_options()
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
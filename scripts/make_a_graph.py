@@ -6,8 +6,28 @@ import os
 from erddapgraph.tabledap import TabledapPlotter
 from erddapgraph import plot_options
 import sys
-import yaml
-from dateutil import parser
+import datetime
+
+
+def _parse_ts(time_string):
+    """
+    Parse a date/time string.  The documented YYYY-mm-ddTHH:MM form is parsed with a fixed strptime format, which
+    skips both the dateutil import and its format-discovery machinery; anything else falls back to the flexible
+    dateutil parser
+    :param time_string: date/time string
+    :return: datetime instance
+    :raises ValueError: when the string cannot be parsed by either parser
+    """
+
+    try:
+        return datetime.datetime.strptime(time_string, '%Y-%m-%dT%H:%M')
+    except ValueError:
+        pass
+
+    # Deferred import: dateutil is only needed for non-standard date/time strings
+    from dateutil import parser
+
+    return parser.parse(time_string)
 
 
 def main(args):
@@ -50,73 +70,79 @@ def main(args):
     clobber = args.clobber
 
     if not os.path.isdir(output_dir):
-        logging.error('Invalid image destination: {:}'.format(output_dir))
+        logging.error('Invalid image destination: %s', output_dir)
         return 1
-    logging.info('Image destination: {:}'.format(os.path.realpath(output_dir)))
+    logging.info('Image destination: %s', os.path.realpath(output_dir))
 
     # Parse the config_file, if specified
     plot_configs = None
     if config_file:
         if not os.path.isfile(config_file):
-            logging.error('Plotting configuration file does not exist: {:}'.format(config_file))
+            logging.error('Plotting configuration file does not exist: %s', config_file)
             return 1
 
+        # Deferred import: only the config loading path pays the PyYAML import cost.  Parse with the libyaml
+        # backed loader when PyYAML was built against it (5-10x faster)
+        import yaml
+        try:
+            from yaml import CSafeLoader as _YamlLoader
+        except ImportError:
+            from yaml import SafeLoader as _YamlLoader
+
         try:
             with open(config_file, 'r') as fid:
-                plot_configs = yaml.safe_load(fid)
+                plot_configs = yaml.load(fid, Loader=_YamlLoader)
         except (OSError, ValueError) as e:
-            logging.error('Error parsing configuration file {:}: {:}'.format(config_file, e))
+            logging.error('Error parsing configuration file %s: %s', config_file, e)
             return 1
 
-    # Create the plotter, set constraints, set plotting options
-    plotter = TabledapPlotter(erddap_url)
+    # Create the plotter, set constraints, set plotting options.  Passing the dataset id here lets the plotter
+    # fetch the datasets table and the dataset description concurrently
+    plotter = TabledapPlotter(erddap_url, dataset_id=dataset_id)
 
     # Set the image destination directory
     plotter.image_path = output_dir
 
     # Make sure the dataset ID is valid
     if dataset_id not in plotter.datasets.index:
-        logging.error('Invalid dataset specified: {:}'.format(dataset_id))
+        logging.error('Invalid dataset specified: %s', dataset_id)
         return 1
 
-    # Set the datasetID
-    plotter.dataset_id = dataset_id
-
     # Make sure the depth_variable is in the data set
     if x_variable not in plotter.dataset_variables:
-        logging.error('X-axis variable {:} not found in the dataset'.format(x_variable))
+        logging.error('X-axis variable %s not found in the dataset', x_variable)
         return 1
 
     if y_variable not in plotter.dataset_variables:
-        logging.error('Y-axis variable {:} not found in the dataset'.format(y_variable))
+        logging.error('Y-axis variable %s not found in the dataset', y_variable)
         return 1
 
     if color_variable and color_variable not in plotter.dataset_variables:
-        logging.error('Color variable {:} not found in the dataset'.format(color_variable))
+        logging.error('Color variable %s not found in the dataset', color_variable)
         return 1
 
     # Handle time constraints
     if hours:
-        logging.info('Plotting profiles less than {:} hours from the max time'.format(hours))
+        logging.info('Plotting profiles less than %s hours from the max time', hours)
         plotter.add_constraint('time', '>=', 'max(time)-{:}hours'.format(hours))
-    else:
+    elif start_time or end_time:
         if start_time:
             try:
-                dt0 = parser.parse(start_time)
+                dt0 = _parse_ts(start_time)
                 ts0 = dt0.strftime('%Y%m%dT%H%M%S')
-                logging.info('Adding time constraint: >={:}'.format(ts0))
+                logging.info('Adding time constraint: >=%s', ts0)
                 plotter.add_constraint('time', '>=', ts0)
             except ValueError as e:
-                logging.error('Error parsing start_time {:}: {:}'.format(start_time, e))
+                logging.error('Error parsing start_time %s: %s', start_time, e)
 
         if end_time:
             try:
-                dt1 = parser.parse(end_time)
+                dt1 = _parse_ts(end_time)
                 ts1 = dt1.strftime('%Y%m%dT%H%M%S')
-                logging.info('Adding time constraint: <={:}'.format(ts1))
-                plotter.add_constraint('time', '>=', ts1)
+                logging.info('Adding time constraint: <=%s', ts1)
+                plotter.add_constraint('time', '<=', ts1)
             except ValueError as e:
-                logging.error('Error parsing start_time {:}: {:}'.format(end_time, e))
+                logging.error('Error parsing end_time %s: %s', end_time, e)
 
     # Set the line style
     plotter.set_line_style(line_style)
@@ -146,7 +172,7 @@ def main(args):
     plotter.build_image_request(x_variable, y_variable, color_variable)
     # Print the url but do not send the request
     if debug:
-        logging.info('URL: {:}'.format(plotter.image_url))
+        logging.info('URL: %s', plotter.image_url)
         logging.info('Skipping request (-x)')
         return 0
 
@@ -154,27 +180,27 @@ def main(args):
 #    image_name = '{:}_{:}_profiles{:}_{:}.png'.format(dataset_id, plot_var, z_type, image_type)
 #    image_path = plotter.download_image(image_name, clobber=clobber)
 #    if image_path:
-#        logging.info('Image written: {:}'.format(image_path))
+#        logging.info('Image written: %s', image_path)
 
 #    for plot_var in plot_variables:
 #
 #        if plot_var not in plotter.dataset_variables:
-#            logging.error('Variable {:} not found in ERDDAP data set: {:}'.format(plot_var, dataset_id))
+#            logging.error('Variable %s not found in ERDDAP data set: %s', plot_var, dataset_id)
 #            continue
 #
 #        if plot_configs and plot_var in plot_configs:
 #            if 'min' in plot_configs[plot_var]:
-#                logging.info('Setting {:} minimum value constraint: {:}'.format(plot_var, plot_configs[plot_var]['min']))
+#                logging.info('Setting %s minimum value constraint: %s', plot_var, plot_configs[plot_var]['min'])
 #                plotter.add_constraint(plot_var, '>=', plot_configs[plot_var]['min'])
 #            if 'max' in plot_configs[plot_var]:
-#                logging.info('Setting {:} maximum value constraint: {:}'.format(plot_var, plot_configs[plot_var]['max']))
+#                logging.info('Setting %s maximum value constraint: %s', plot_var, plot_configs[plot_var]['max'])
 #                plotter.add_constraint(plot_var, '<=', plot_configs[plot_var]['max'])
 #
 #        logging.info('Creating url...')
 #        plotter.build_image_request(plot_var, depth_variable, color_variable)
 #        # Print the url but do not send the request
 #        if debug:
-#            logging.info('URL: {:}'.format(plotter.image_url))
+#            logging.info('URL: %s', plotter.image_url)
 #            logging.info('Skipping request (-x)')
 #            continue
 #
@@ -182,7 +208,7 @@ def main(args):
 #        image_name = '{:}_{:}_profiles{:}_{:}.png'.format(dataset_id, plot_var, z_type, image_type)
 #        image_path = plotter.download_image(image_name, clobber=clobber)
 #        if image_path:
-#            logging.info('Image written: {:}'.format(image_path))
+#            logging.info('Image written: %s', image_path)
 
 
 if __name__ == '__main__':
@@ -263,7 +289,7 @@ if __name__ == '__main__':
     arg_parser.add_argument('-m', '--markercolor',
                             type=str,
                             help='Marker color',
-                            choices=plot_options['colors'].keys(),
+                            choices=plot_options['colors'],
                             default='black')
 
     arg_parser.add_argument('-t', '--markertype',
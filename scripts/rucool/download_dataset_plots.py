@@ -0,0 +1,293 @@
+#!/usr/bin/env python
+
+import argparse
+import logging
+import os
+from erddapgraph import plot_options
+import sys
+import time
+from plot_utils import load_plot_variables, setup_plotter, parse_time_window, build_profile_jobs, \
+    build_timeseries_jobs
+
+
+def main(args):
+    """Create ERDDAP image request urls for the profile and time series plots of the data set with the specified
+    dataset ID and download all of the images concurrently using a single plotter/session"""
+
+    # Set up logger
+    log_level = getattr(logging, args.loglevel.upper())
+    log_format = '%(asctime)s:%(module)s:%(levelname)s:%(message)s [line %(lineno)d]'
+    logging.basicConfig(format=log_format, level=log_level)
+
+    dataset_id = args.dataset_id
+    datasets_file = args.datasets_file
+    x_variable = args.xvar
+    y_variable = args.yvar
+    color_variable = args.color
+    cmin = args.cmin
+    cmax = args.cmax
+    start_time = args.start_time
+    end_time = args.end_time
+    hours = args.hours
+    output_dir = args.outputdir
+    image_type = args.image_type
+    marker_size = args.markersize
+    marker_type = args.markertype
+    marker_color = args.markercolor
+    line_style = args.graphtype
+    color_bar = args.colorbar
+    default_colorbar = args.default_colorbar
+    erddap_url = args.url
+    debug = args.debug
+    clobber = args.clobber
+    concurrency = args.concurrency
+
+    # Load the default plotting parameters and merge in the deployment specific configuration
+    plot_variables = load_plot_variables(args.defaults, config_file=args.config_file)
+    if plot_variables is None:
+        return 1
+
+    # Collect the dataset ids to plot: newline-delimited ids from --datasets-file (blank lines and # comments
+    # skipped) or the single positional dataset_id
+    dataset_ids = []
+    if datasets_file:
+        if not os.path.isfile(datasets_file):
+            logging.error('Invalid datasets file: %s', datasets_file)
+            return 1
+        with open(datasets_file, 'r') as fid:
+            dataset_ids = [line.strip() for line in fid if line.strip() and not line.startswith('#')]
+        if not dataset_ids:
+            logging.error('No dataset ids found in datasets file: %s', datasets_file)
+            return 1
+    elif dataset_id:
+        dataset_ids = [dataset_id]
+    else:
+        logging.error('No dataset_id or --datasets-file specified')
+        return 1
+
+    # Create the plotter and set the image destination.  The plotter and its HTTP session are shared by all of the
+    # datasets and requests so the datasets catalog is fetched once.  No dataset id is selected here: invalid ids
+    # anywhere in the list, including the first, are skipped with a warning below rather than aborting the run
+    cache_ttl = 0 if args.no_cache else args.cache_ttl
+    plotter = setup_plotter(erddap_url, None, output_dir, cache_ttl=cache_ttl)
+    if plotter is None:
+        return 1
+
+    # Validate the full fleet against the catalog once, up front
+    valid_ids = [did for did in dataset_ids if did in plotter.datasets.index]
+    invalid_ids = [did for did in dataset_ids if did not in plotter.datasets.index]
+    if invalid_ids:
+        logging.warning('Skipping %s invalid dataset ids: %s', len(invalid_ids), ', '.join(invalid_ids))
+    if not valid_ids:
+        logging.error('No valid dataset ids specified')
+        return 1
+
+    # Handle time constraints
+    ts0, ts1 = parse_time_window(start_time, end_time)
+    if hours:
+        logging.info('Plotting records less than %s hours from the max time', hours)
+        ts0 = None
+        ts1 = None
+
+    # Set the line style
+    plotter.set_line_style(line_style)
+
+    # Set the marker
+    plotter.set_marker_style(marker_type, marker_size)
+
+    # Set the marker color
+    plotter.set_marker_color(marker_color)
+
+    # Set the image type
+    plotter.image_type = image_type
+
+    # Phase 1: build all of the profile and time series image request urls serially for each dataset (cheap, shares
+    # the plotter state), then download the full batch concurrently
+    download_jobs = []
+    for did in valid_ids:
+
+        plotter.dataset_id = did
+
+        if y_variable not in plotter.dataset_variables:
+            logging.warning('Y-axis variable %s not found in dataset %s', y_variable, did)
+            continue
+        if x_variable not in plotter.dataset_variables:
+            logging.warning('X-axis variable %s not found in dataset %s', x_variable, did)
+            continue
+        if color_variable and color_variable not in plotter.dataset_variables:
+            logging.warning('Color variable %s not found in dataset %s', color_variable, did)
+            continue
+
+        download_jobs += build_profile_jobs(plotter,
+                                            plot_variables,
+                                            y_variable,
+                                            color_variable=color_variable,
+                                            color_bar=color_bar,
+                                            cmin=cmin,
+                                            cmax=cmax,
+                                            hours=hours,
+                                            ts0=ts0,
+                                            ts1=ts1,
+                                            clobber=clobber,
+                                            debug=debug)
+
+        download_jobs += build_timeseries_jobs(plotter,
+                                               plot_variables,
+                                               x_variable,
+                                               y_variable,
+                                               default_colorbar=default_colorbar,
+                                               hours=hours,
+                                               ts0=ts0,
+                                               ts1=ts1,
+                                               clobber=clobber,
+                                               debug=debug)
+
+    # Phase 2: download the batch
+    if download_jobs:
+        it0 = time.perf_counter()
+        image_paths = plotter.download_images(download_jobs, max_workers=concurrency, clobber=clobber)
+        i_delta = time.perf_counter() - it0
+        logging.info('%s images downloaded in %.1f seconds', len(image_paths), i_delta)
+        for image_path in image_paths:
+            logging.info('Image written: %s', image_path)
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description=main.__doc__,
+                                         formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    arg_parser.add_argument('dataset_id',
+                            nargs='?',
+                            help='Dataset ID string to search for')
+
+    arg_parser.add_argument('--datasets-file',
+                            help='File containing newline-delimited dataset ids to plot instead of a single '
+                                 'dataset_id')
+
+    arg_parser.add_argument('-x', '--xvar',
+                            type=str,
+                            default='time',
+                            help='X-axis variable for the time series plots')
+
+    arg_parser.add_argument('-y', '--yvar',
+                            type=str,
+                            default='depth',
+                            help='Depth variable to use for the y-axis')
+
+    arg_parser.add_argument('-c', '--color',
+                            type=str,
+                            help='Color the profile markers using the specified variable. If not specified, the '
+                                 'default marker color is used')
+
+    arg_parser.add_argument('--cmin',
+                            help='Minimum color bar value for the profile plots')
+
+    arg_parser.add_argument('--cmax',
+                            help='Maximum color bar value for the profile plots')
+
+    arg_parser.add_argument('--config_file',
+                            help='YAML file containing variables and min/max limits for plotting')
+
+    arg_parser.add_argument('--start',
+                            help='Start date/time string [YYYY-mm-ddTHH:MM]',
+                            dest='start_time')
+
+    arg_parser.add_argument('--end',
+                            help='End date/time string [YYYY-mm-ddTHH:MM]',
+                            dest='end_time')
+
+    arg_parser.add_argument('--lasthrs',
+                            help='Number of previous hours to plot from max time',
+                            dest='hours',
+                            type=int,
+                            default=24)
+
+    arg_parser.add_argument('-o', '--outputdir',
+                            type=str,
+                            help='Write location',
+                            default='.')
+
+    arg_parser.add_argument('--no-cache',
+                            action='store_true',
+                            help='Always revalidate the datasets catalog with the server')
+
+    arg_parser.add_argument('--cache-ttl',
+                            type=int,
+                            default=3600,
+                            help='Seconds to serve the cached datasets catalog without contacting the server')
+
+    arg_parser.add_argument('--concurrency',
+                            type=int,
+                            default=5,
+                            help='Maximum number of concurrent image downloads')
+
+    arg_parser.add_argument('--clobber',
+                            action='store_true',
+                            help='Clobber existing image if the file already exists')
+
+    arg_parser.add_argument('-i', '--image_type',
+                            type=str,
+                            choices=plot_options['image_types'],
+                            default='largePng',
+                            help='Image type')
+
+    arg_parser.add_argument('-s', '--markersize',
+                            type=int,
+                            help='Marker size',
+                            default=5)
+
+    arg_parser.add_argument('-m', '--markercolor',
+                            type=str,
+                            help='Marker color',
+                            choices=plot_options['colors'],
+                            default='black')
+
+    arg_parser.add_argument('-t', '--markertype',
+                            type=str,
+                            help='Marker type from ERDDAP graph marker pulldown',
+                            choices=plot_options['marker_types'],
+                            default='Circle')
+
+    arg_parser.add_argument('-g', '--graphtype',
+                            type=str,
+                            help='Line style from ERDDAP graph marker pulldown',
+                            choices=plot_options['line_styles'],
+                            default='markers')
+
+    arg_parser.add_argument('--colorbar',
+                            type=str,
+                            help='Colorbar name for the profile plots',
+                            choices=plot_options['color_bars'],
+                            default='Rainbow2')
+
+    arg_parser.add_argument('--default_colorbar',
+                            type=str,
+                            help='Name of the time series color bar to use if not specified in the config file(s)',
+                            choices=plot_options['color_bars'],
+                            default='Rainbow2')
+
+    arg_parser.add_argument('-u', '--url',
+                            help='ERDDAP server base url',
+                            default='http://slocum-data.marine.rutgers.edu/erddap')
+
+    arg_parser.add_argument('-d', '--defaults',
+                            help='YAML sensors and plotting defaults',
+                            default=os.path.realpath(os.path.join(os.path.dirname(__file__),
+                                                                  '..',
+                                                                  '..',
+                                                                  'config',
+                                                                  'erddap_plot_vars.yml')))
+
+    arg_parser.add_argument('--debug',
+                            help='Print image request URL but do not send the request',
+                            action='store_true')
+
+    arg_parser.add_argument('-l', '--loglevel',
+                            help='Verbosity level <Default=info>',
+                            type=str,
+                            choices=['debug', 'info', 'warning', 'error', 'critical'],
+                            default='info')
+
+    parsed_args = arg_parser.parse_args()
+
+    sys.exit(main(parsed_args))
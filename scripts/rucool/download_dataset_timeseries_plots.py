@@ -3,12 +3,10 @@
 import argparse
 import logging
 import os
-from erddapgraph.tabledap import TabledapPlotter
 from erddapgraph import plot_options
 import sys
-import yaml
-import datetime
-from dateutil import parser
+import time
+from plot_utils import load_plot_variables, setup_plotter, parse_time_window, build_timeseries_jobs
 
 
 def main(args):
@@ -22,9 +20,7 @@ def main(args):
     plotting_defaults_file = args.defaults
     dataset_id = args.dataset_id
     x_variable = args.xvar
-    x_ascending = True
     y_variable = args.yvar
-    y_ascending = False
     config_file = args.config_file
     start_time = args.start_time
     end_time = args.end_time
@@ -38,96 +34,35 @@ def main(args):
     erddap_url = args.url
     debug = args.debug
     clobber = args.clobber
-    default_colorbar = 'Rainbow2'
+    concurrency = args.concurrency
+    default_colorbar = args.default_colorbar
 
-    # Validate default plotting parameters file
-    if not os.path.isfile(plotting_defaults_file):
-        logging.error('Invalid plotting defaults file: {:}'.format(plotting_defaults_file))
-        return 1
-    try:
-        with open(plotting_defaults_file, 'r') as fid:
-            plot_variables = yaml.safe_load(fid)
-    except Exception as e:
-        logging.error('Default plotting parameters file: {:} ({:})'.format(plotting_defaults_file, e))
+    # Load the default plotting parameters and merge in the deployment specific configuration
+    plot_variables = load_plot_variables(plotting_defaults_file, config_file=config_file)
+    if plot_variables is None:
         return 1
 
-    if not os.path.isdir(output_dir):
-        logging.error('Invalid image destination: {:}'.format(output_dir))
-        return 1
-    logging.info('Image destination: {:}'.format(os.path.realpath(output_dir)))
-
-    # Load the deployment specific plot parameters if specified in config_file
-    plot_configs = None
-    if config_file:
-        logging.info('Loading deployment plot configuration: {:}'.format(config_file))
-        if not os.path.isfile(config_file):
-            logging.error('Plotting configuration file does not exist: {:}'.format(config_file))
-            return 1
-
-        try:
-            with open(config_file, 'r') as fid:
-                plot_configs = yaml.safe_load(fid)
-        except (OSError, ValueError) as e:
-            logging.error('Error parsing configuration file {:}: {:}'.format(config_file, e))
-            return 1
-
-    if plot_configs:
-        logging.info('Updating default plotting variables and parameters')
-        for plot_variable in plot_configs.keys():
-            if plot_variable not in plot_variables:
-                logging.info('Creating new plot variable: {:}'.format(plot_variable))
-                plot_variables[plot_variable] = plot_configs[plot_variable]
-            else:
-                logging.info('Updating existing plot variable parameters: {:}'.format(plot_variable))
-                plot_variables[plot_variable].update(plot_configs[plot_variable])
-
-    # Create the plotter, set constraints, set plotting options
-    plotter = TabledapPlotter(erddap_url)
-
-    # Set the image destination directory
-    plotter.image_path = output_dir
-
-    # Make sure the dataset ID is valid
-    if dataset_id not in plotter.datasets.index.to_list():
-        logging.error('Invalid dataset specified: {:}'.format(dataset_id))
+    # Create the plotter, set the image destination and select the dataset
+    cache_ttl = 0 if args.no_cache else args.cache_ttl
+    plotter = setup_plotter(erddap_url, dataset_id, output_dir, cache_ttl=cache_ttl)
+    if plotter is None:
         return 1
 
-    # Set the datasetID
-    plotter.dataset_id = dataset_id
-
     if y_variable not in plotter.dataset_variables:
-        logging.error('Y-axis variable {:} not found in the dataset'.format(y_variable))
+        logging.error('Y-axis variable %s not found in the dataset', y_variable)
         return 1
-    logging.info('Y-Axis variable is {:}'.format(y_variable))
+    logging.info('Y-Axis variable is %s', y_variable)
     if x_variable not in plotter.dataset_variables:
-        logging.error('X-axis variable {:} not found in the dataset'.format(x_variable))
+        logging.error('X-axis variable %s not found in the dataset', x_variable)
         return 1
-    logging.info('X-Axis variable is {:}'.format(x_variable))
+    logging.info('X-Axis variable is %s', x_variable)
 
     # Handle time constraints
-    ts0 = None
-    ts1 = None
+    ts0, ts1 = parse_time_window(start_time, end_time)
     if hours:
-        logging.info('Plotting profiles less than {:} hours from the max time'.format(hours))
-    #        plotter.add_constraint('time', '>=', 'max(time)-{:}hours'.format(hours))
-    else:
-        if start_time:
-            try:
-                dt0 = parser.parse(start_time)
-                ts0 = dt0.strftime('%Y%m%dT%H%M%S')
-#                logging.info('Adding time constraint: >={:}'.format(ts0))
-            #                plotter.add_constraint('time', '>=', ts0)
-            except ValueError as e:
-                logging.error('Error parsing start_time {:}: {:}'.format(start_time, e))
-
-        if end_time:
-            try:
-                dt1 = parser.parse(end_time)
-                ts1 = dt1.strftime('%Y%m%dT%H%M%S')
-#                logging.info('Adding time constraint: <={:}'.format(ts1))
-            #                plotter.add_constraint('time', '>=', ts1)
-            except ValueError as e:
-                logging.error('Error parsing start_time {:}: {:}'.format(end_time, e))
+        logging.info('Plotting time series less than %s hours from the max time', hours)
+        ts0 = None
+        ts1 = None
 
     # Set the line style
     plotter.set_line_style(line_style)
@@ -141,113 +76,28 @@ def main(args):
     # Set the image type
     plotter.image_type = image_type
 
-    for plot_var in plot_variables:
-
-        if plot_var not in plotter.dataset_variables:
-            logging.debug('Variable {:} not found in ERDDAP data set: {:}'.format(plot_var, dataset_id))
-            continue
-
-        logging.info('Plotting {:} time series'.format(plot_var))
-
-        # Clear previous constraints
-        plotter.clear_constraints()
-
-        # Add time constraints if there are any
-        if hours:
-            plotter.add_constraint('time', '>=', 'max(time)-{:}hours'.format(hours))
-        else:
-            if ts0:
-                plotter.add_constraint('time', '>=', ts0)
-            if ts1:
-                plotter.add_constraint('time', '<=', ts1)
-
-        # Fill in and add plot_variables[plot_var]['min'] and plot_variables[plot_var]['max'] from the variable's
-        # 'actual_range' attribute if not specified in either the plotting_defaults_file or config_file
-        if 'min' not in plot_variables[plot_var]:
-            logging.info('No minimum value set for {:}'.format(plot_var))
-            var_atts = plotter.get_variable_attributes(plot_var)
-            if not var_atts.empty:
-                # See if the variable contains an 'actual_range' attribute
-                range_attr = var_atts[var_atts.attribute_name == 'actual_range']
-                if not range_attr.empty:
-                    min_value = float(range_attr.iloc[0]['value'].split(',')[0])
-                    logging.info(
-                        'Setting {:} min parameter to value in {:}:actual_range attribute: {:}'.format(plot_var,
-                                                                                                       plot_var,
-                                                                                                       min_value))
-                    plot_variables[plot_var]['min'] = min_value
-
-        if 'max' not in plot_variables[plot_var]:
-            logging.info('No maximum value set for {:}'.format(plot_var))
-            var_atts = plotter.get_variable_attributes(plot_var)
-            if not var_atts.empty:
-                # See if the variable contains an 'actual_range' attribute
-                range_attr = var_atts[var_atts.attribute_name == 'actual_range']
-                if not range_attr.empty:
-                    max_value = float(range_attr.iloc[0]['value'].split(',')[1])
-                    logging.info(
-                        'Updating {:} max parameter to value in {:}:actual_range attribute: {:}'.format(plot_var,
-                                                                                                        plot_var,
-                                                                                                        max_value))
-                    plot_variables[plot_var]['max'] = max_value
-
-        cmin = None
-        cmax = None
-        if 'min' in plot_variables[plot_var]:
-#            logging.info('Setting {:} minimum value constraint: {:}'.format(plot_var, plot_variables[plot_var]['min']))
-#            plotter.add_constraint(plot_var, '>=', plot_variables[plot_var]['min'])
-            logging.info('Setting {:} minimum colorbar value: {:}'.format(plot_var, plot_variables[plot_var]['min']))
-            cmin = plot_variables[plot_var]['min']
-        if 'max' in plot_variables[plot_var]:
-#            logging.info('Setting {:} maximum value constraint: {:}'.format(plot_var, plot_variables[plot_var]['max']))
-#            plotter.add_constraint(plot_var, '<=', plot_variables[plot_var]['max'])
-            logging.info('Setting {:} maximum colorbar value: {:}'.format(plot_var, plot_variables[plot_var]['max']))
-            cmax = plot_variables[plot_var]['max']
-
-        # Set the depth variable constraints if specified
-        if 'zmin' in plot_variables[plot_var]:
-            logging.info('Setting {:} minimum value constraint: {:}'.format(y_variable, plot_variables[plot_var]['zmin']))
-            plotter.add_constraint(y_variable, '>=', plot_variables[plot_var]['zmin'])
-        if 'zmax' in plot_variables[plot_var]:
-            logging.info('Setting {:} maximum value constraint: {:}'.format(y_variable, plot_variables[plot_var]['zmax']))
-            plotter.add_constraint(y_variable, '<=', plot_variables[plot_var]['zmax'])
-
-        # If plot_variables[plot_var]['_FillValue'] exists, set a constraint to prevent plotting _FillValues when not
-        # defined in the data set
-        if '_FillValue' in plot_variables[plot_var]:
-            logging.info('Setting _FillValue constraint: {:}'.format(plot_variables[plot_var]['_FillValue']))
-            plotter.add_constraint(plot_var, '!=', plot_variables[plot_var]['_FillValue'])
-
-        # Set the x-axis direction
-        plotter.set_x_range(ascending=x_ascending)
-
-        # Set the y-axis direction
-        plotter.set_y_range(ascending=y_ascending)
-
-        # Set the color bar with color bar name, min and max values
-        plot_var_colorbar = plot_variables[plot_var].get('colorbar', default_colorbar)
-        plotter.set_color_bar(plot_var_colorbar, min_value=cmin, max_value=cmax)
-
-        # Add constraint to NOT plot NaN values
-        plotter.add_constraint(plot_var, '!=', 'NaN')
-
-        logging.info('Creating url...')
-        plotter.build_image_request(x_variable, y_variable, plot_var)
-        # Print the url but do not send the request
-        if debug:
-            logging.info('URL: {:}'.format(plotter.image_url))
-            logging.info('Skipping request (-x)')
-            continue
-
-        # Download the image
-        image_name = '{:}_{:}_ts_{:}.png'.format(dataset_id, plot_var, image_type)
-        it0 = datetime.datetime.now()
-        image_path = plotter.download_image(image_name, clobber=clobber)
-        it1 = datetime.datetime.now()
-        i_delta = it1 - it0
-        logging.info('{:} profiles image downloaded in {:0.1f} seconds'.format(plot_var, i_delta.total_seconds()))
-        if image_path:
-            logging.info('Image written: {:}'.format(image_path))
+    # Phase 1: build all of the image request urls serially (cheap, shares the plotter state), then download the
+    # batch concurrently.  Each request is I/O bound on the ERDDAP server's render time, so the downloads overlap
+    download_jobs = build_timeseries_jobs(plotter,
+                                          plot_variables,
+                                          x_variable,
+                                          y_variable,
+                                          default_colorbar=default_colorbar,
+                                          hours=hours,
+                                          ts0=ts0,
+                                          ts1=ts1,
+                                          clobber=clobber,
+                                          debug=debug)
+
+    # Phase 2: download the batch
+    if download_jobs:
+        it0 = time.perf_counter()
+        image_paths = plotter.download_images(download_jobs, max_workers=concurrency, clobber=clobber)
+        i_delta = time.perf_counter() - it0
+        logging.info(
+            '%s time series images downloaded in %.1f seconds', len(image_paths), i_delta)
+        for image_path in image_paths:
+            logging.info('Image written: %s', image_path)
 
 
 if __name__ == '__main__':
@@ -294,6 +144,20 @@ if __name__ == '__main__':
                             help='Write location',
                             default='.')
 
+    arg_parser.add_argument('--no-cache',
+                            action='store_true',
+                            help='Always revalidate the datasets catalog with the server')
+
+    arg_parser.add_argument('--cache-ttl',
+                            type=int,
+                            default=3600,
+                            help='Seconds to serve the cached datasets catalog without contacting the server')
+
+    arg_parser.add_argument('--concurrency',
+                            type=int,
+                            default=5,
+                            help='Maximum number of concurrent image downloads')
+
     arg_parser.add_argument('--clobber',
                             action='store_true',
                             help='Clobber existing image if the file already exists')
@@ -312,7 +176,7 @@ if __name__ == '__main__':
     arg_parser.add_argument('-m', '--markercolor',
                             type=str,
                             help='Marker color',
-                            choices=plot_options['colors'].keys(),
+                            choices=plot_options['colors'],
                             default='black')
 
     arg_parser.add_argument('-t', '--markertype',
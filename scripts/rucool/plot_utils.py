@@ -0,0 +1,376 @@
+"""Shared setup and job building helpers for the rucool plot download scripts.
+
+Consolidates the plotting defaults/config loading, plotter creation, time constraint handling and per-variable image
+url building so the individual scripts and the combined driver share one code path (and one plotter/session) instead
+of repeating the setup per invocation.
+"""
+
+import datetime
+import logging
+import os
+from erddapgraph.tabledap import TabledapPlotter
+
+
+def load_plot_variables(plotting_defaults_file, config_file=None):
+    """
+    Load the default plotting variables/parameters and merge in the optional deployment specific configuration
+    :param plotting_defaults_file: YAML file containing the default plotting variables and parameters
+    :param config_file: optional YAML file containing deployment specific overrides
+    :return: dictionary of plotting variables and parameters or None on error
+    """
+
+    if not os.path.isfile(plotting_defaults_file):
+        logging.error('Invalid plotting defaults file: %s', plotting_defaults_file)
+        return
+
+    # Deferred import: only the config loading path pays the PyYAML import cost.  The loader serves the parsed
+    # documents from an mtime/size keyed on-disk pickle cache across invocations and parses with the libyaml
+    # backed loader on a miss
+    from erddapgraph.yaml_cache import load_yaml_cached
+
+    plot_variables = load_yaml_cached(plotting_defaults_file)
+    if plot_variables is None:
+        logging.error('Default plotting parameters file: %s', plotting_defaults_file)
+        return
+
+    if not config_file:
+        return plot_variables
+
+    if not os.path.isfile(config_file):
+        logging.error('Plotting configuration file does not exist: %s', config_file)
+        return
+
+    plot_configs = load_yaml_cached(config_file)
+    if plot_configs is None:
+        logging.error('Error parsing configuration file %s', config_file)
+        return
+
+    if plot_configs:
+        logging.info('Updating default plotting variables and parameters')
+        # setdefault covers both the new-variable and override cases in a single branch-free merge
+        for plot_variable, parameters in plot_configs.items():
+            logging.info('Merging plot variable parameters: %s', plot_variable)
+            plot_variables.setdefault(plot_variable, {}).update(parameters)
+
+    return plot_variables
+
+
+def setup_plotter(erddap_url, dataset_id, output_dir, cache_ttl=0):
+    """
+    Create a TabledapPlotter, configure the image destination and optionally select the dataset
+    :param erddap_url: ERDDAP server base url
+    :param dataset_id: dataset id to select or None to defer dataset selection to the caller
+    :param output_dir: image destination directory
+    :param cache_ttl: seconds to serve the cached datasets catalog without contacting the server
+    :return: configured TabledapPlotter instance or None on error
+    """
+
+    if not os.path.isdir(output_dir):
+        logging.error('Invalid image destination: %s', output_dir)
+        return
+    logging.info('Image destination: %s', os.path.realpath(output_dir))
+
+    plotter = TabledapPlotter(erddap_url)
+    if cache_ttl:
+        plotter.datasets_cache_ttl = cache_ttl
+
+    plotter.image_path = output_dir
+
+    if dataset_id is not None:
+        if dataset_id not in plotter.datasets.index:
+            logging.error('Invalid dataset specified: %s', dataset_id)
+            return
+
+        plotter.dataset_id = dataset_id
+
+    return plotter
+
+
+def parse_time_window(start_time, end_time):
+    """
+    Parse the optional start/end time strings into ERDDAP constraint timestamps
+    :param start_time: start date/time string or None
+    :param end_time: end date/time string or None
+    :return: (ts0, ts1) tuple of formatted timestamps, either of which may be None
+    """
+
+    ts0 = None
+    ts1 = None
+    if start_time:
+        try:
+            ts0 = _parse_ts(start_time).strftime('%Y%m%dT%H%M%S')
+        except ValueError as e:
+            logging.error('Error parsing start_time %s: %s', start_time, e)
+    if end_time:
+        try:
+            ts1 = _parse_ts(end_time).strftime('%Y%m%dT%H%M%S')
+        except ValueError as e:
+            logging.error('Error parsing end_time %s: %s', end_time, e)
+
+    return ts0, ts1
+
+
+def _parse_ts(time_string):
+    """
+    Parse a date/time string.  The documented YYYY-mm-ddTHH:MM form is parsed with a fixed strptime format, which
+    skips both the dateutil import and its format-discovery machinery; anything else falls back to the flexible
+    dateutil parser
+    :param time_string: date/time string
+    :return: datetime instance
+    :raises ValueError: when the string cannot be parsed by either parser
+    """
+
+    try:
+        return datetime.datetime.strptime(time_string, '%Y-%m-%dT%H:%M')
+    except ValueError:
+        pass
+
+    # Deferred import: dateutil is only needed for non-standard date/time strings
+    from dateutil import parser
+
+    return parser.parse(time_string)
+
+
+def build_time_constraints(hours=None, ts0=None, ts1=None):
+    """
+    Build the list of (variable, operator, value) time constraint tuples.  hours takes precedence over the explicit
+    window.  The formatted strings are built once so the per-variable loops can re-apply them via
+    plotter.set_constraints without reformatting
+    :param hours: number of previous hours to plot from max time
+    :param ts0: formatted start timestamp
+    :param ts1: formatted end timestamp
+    :return: list of (variable, operator, value) tuples
+    """
+
+    if hours:
+        return [('time', '>=', 'max(time)-{:}hours'.format(hours))]
+
+    time_constraints = []
+    if ts0:
+        time_constraints.append(('time', '>=', ts0))
+    if ts1:
+        time_constraints.append(('time', '<=', ts1))
+
+    return time_constraints
+
+
+def build_profile_jobs(plotter, plot_variables, y_variable, color_variable=None, color_bar=None, cmin=None, cmax=None,
+                       hours=None, ts0=None, ts1=None, clobber=False, debug=False):
+    """
+    Build the (image_url, image_name) download jobs for a profile plot of each plotting variable.  The urls are
+    built serially since they share the plotter state, leaving the downloads free to run concurrently via
+    plotter.download_images
+    :param plotter: configured TabledapPlotter instance with the dataset id selected
+    :param plot_variables: dictionary of plotting variables and parameters
+    :param y_variable: depth variable for the y-axis
+    :param color_variable: optional variable used to color the markers
+    :param color_bar: optional color bar name
+    :param cmin: minimum color bar value
+    :param cmax: maximum color bar value
+    :param hours: number of previous hours to plot from max time
+    :param ts0: formatted start timestamp
+    :param ts1: formatted end timestamp
+    :param clobber: False to skip plot variables whose image file already exists
+    :param debug: log the urls but do not queue any downloads
+    :return: list of (image_url, image_name) tuples
+    """
+
+    dataset_id = plotter.dataset_id
+    image_type = plotter.image_type
+    # Hoist the formatted time constraints out of the loop; they are identical for every plot variable
+    time_constraints = build_time_constraints(hours=hours, ts0=ts0, ts1=ts1)
+    # Validate the plot variables against the dataset in one pass up front so the loop only touches variables that
+    # will actually produce a plot
+    dataset_variables = set(plotter.dataset_variables)
+    missing = {v for v in plot_variables if v not in dataset_variables}
+    if missing:
+        logging.warning(
+            'Skipping %s variables not in data set %s: %s', len(missing), dataset_id,
+                                                                     ', '.join(sorted(missing)))
+    download_jobs = []
+    for plot_var in plot_variables:
+
+        if plot_var in missing:
+            continue
+
+        # Short-circuit before any constraint/url work: when the image already exists and clobbering was not
+        # requested the download would be skipped anyway
+        image_name = '{:}_{:}_profiles_{:}.png'.format(dataset_id, plot_var, image_type)
+        if not clobber and (plotter.image_path / image_name).is_file():
+            logging.info('Skipping existing image file: %s', image_name)
+            continue
+
+        logging.info('Plotting %s profiles', plot_var)
+
+        # Reset to the shared time constraints in one pass
+        plotter.set_constraints(time_constraints)
+
+        # Set the x and y minimum values
+        x_min = plot_variables[plot_var].get('min')
+        if x_min is not None:
+            logging.info('Setting %s minimum value: %s', plot_var, x_min)
+
+        x_max = plot_variables[plot_var].get('max')
+        if x_max is not None:
+            logging.info('Setting %s maximum value: %s', plot_var, x_max)
+
+        y_min = plot_variables[plot_var].get('zmin')
+        if y_min is not None:
+            logging.info('Setting %s depth minimum value: %s', plot_var, y_min)
+
+        y_max = plot_variables[plot_var].get('zmax')
+        if y_max is not None:
+            logging.info('Setting %s depth maximum value: %s', plot_var, y_max)
+
+        # If plot_variables[plot_var]['_FillValue'] exists, set a constraint to prevent plotting _FillValues when not
+        # defined in the data set
+        if '_FillValue' in plot_variables[plot_var]:
+            logging.info('Setting _FillValue constraint: %s', plot_variables[plot_var]['_FillValue'])
+            plotter.add_constraint(plot_var, '!=', plot_variables[plot_var]['_FillValue'])
+
+        # Set the x-axis
+        plotter.set_x_range(min_value=x_min, max_value=x_max, ascending=True)
+
+        # Set the y-axis
+        plotter.set_y_range(min_value=y_min, max_value=y_max, ascending=False)
+
+        # Set the color bar
+        if color_bar:
+            plotter.set_color_bar(color_bar, min_value=cmin, max_value=cmax)
+
+        # Add constraint to NOT plot NaN values
+        plotter.add_constraint(plot_var, '!=', 'NaN')
+
+        logging.info('Creating url...')
+        image_url = plotter.build_image_request(plot_var, y_variable, color_variable)
+        if not image_url:
+            continue
+
+        # Print the url but do not queue the request
+        if debug:
+            logging.info('URL: %s', image_url)
+            logging.info('Skipping request (-x)')
+            continue
+
+        download_jobs.append((image_url, image_name))
+
+    return download_jobs
+
+
+def build_timeseries_jobs(plotter, plot_variables, x_variable, y_variable, default_colorbar='Rainbow2', hours=None,
+                          ts0=None, ts1=None, clobber=False, debug=False):
+    """
+    Build the (image_url, image_name) download jobs for a time series plot of each plotting variable, colored by the
+    plotting variable.  Missing min/max plot parameters are filled in from the variable's actual_range attribute
+    :param plotter: configured TabledapPlotter instance with the dataset id selected
+    :param plot_variables: dictionary of plotting variables and parameters
+    :param x_variable: x-axis variable
+    :param y_variable: depth variable for the y-axis
+    :param default_colorbar: color bar name to use when not specified in the plot parameters
+    :param hours: number of previous hours to plot from max time
+    :param ts0: formatted start timestamp
+    :param ts1: formatted end timestamp
+    :param clobber: False to skip plot variables whose image file already exists
+    :param debug: log the urls but do not queue any downloads
+    :return: list of (image_url, image_name) tuples
+    """
+
+    dataset_id = plotter.dataset_id
+    image_type = plotter.image_type
+    # Hoist the formatted time constraints out of the loop; they are identical for every plot variable
+    time_constraints = build_time_constraints(hours=hours, ts0=ts0, ts1=ts1)
+    # Validate the plot variables against the dataset in one pass up front so the loop only touches variables that
+    # will actually produce a plot
+    dataset_variables = set(plotter.dataset_variables)
+    missing = {v for v in plot_variables if v not in dataset_variables}
+    if missing:
+        logging.warning(
+            'Skipping %s variables not in data set %s: %s', len(missing), dataset_id,
+                                                                     ', '.join(sorted(missing)))
+
+    # The axis directions never change across plot variables; set them once.  Plot parameters persist on the
+    # plotter across constraint resets
+    plotter.set_x_range(ascending=True)
+    plotter.set_y_range(ascending=False)
+
+    # Pull the actual_range bounds for every variable in one vectorized pass instead of filtering the attribute
+    # table per variable inside the loop
+    actual_ranges = plotter.get_all_actual_ranges()
+
+    download_jobs = []
+    for plot_var in plot_variables:
+
+        if plot_var in missing:
+            continue
+
+        # Short-circuit before any constraint/url work: when the image already exists and clobbering was not
+        # requested the download would be skipped anyway
+        image_name = '{:}_{:}_ts_{:}.png'.format(dataset_id, plot_var, image_type)
+        if not clobber and (plotter.image_path / image_name).is_file():
+            logging.info('Skipping existing image file: %s', image_name)
+            continue
+
+        logging.info('Plotting %s time series', plot_var)
+
+        # Reset to the shared time constraints in one pass
+        plotter.set_constraints(time_constraints)
+
+        # Fill in the min/max plot parameters from the variable's 'actual_range' attribute if not specified in
+        # either the plotting_defaults_file or config_file.  The fill-ins stay local so one dataset's ranges are
+        # never written back into the shared plot_variables dict and carried over to the next dataset
+        cmin = plot_variables[plot_var].get('min')
+        cmax = plot_variables[plot_var].get('max')
+        if cmin is None or cmax is None:
+            actual_range = actual_ranges.get(plot_var)
+            if actual_range:
+                if cmin is None:
+                    logging.info('Setting %s min parameter to value in %s:actual_range attribute: %s',
+                                 plot_var, plot_var, actual_range[0])
+                    cmin = actual_range[0]
+                if cmax is None:
+                    logging.info('Updating %s max parameter to value in %s:actual_range attribute: %s',
+                                 plot_var, plot_var, actual_range[1])
+                    cmax = actual_range[1]
+
+        if cmin is not None:
+            logging.info('Setting %s minimum colorbar value: %s', plot_var, cmin)
+        if cmax is not None:
+            logging.info('Setting %s maximum colorbar value: %s', plot_var, cmax)
+
+        # Set the depth variable constraints if specified
+        if 'zmin' in plot_variables[plot_var]:
+            logging.info(
+                'Setting %s minimum value constraint: %s', y_variable, plot_variables[plot_var]['zmin'])
+            plotter.add_constraint(y_variable, '>=', plot_variables[plot_var]['zmin'])
+        if 'zmax' in plot_variables[plot_var]:
+            logging.info(
+                'Setting %s maximum value constraint: %s', y_variable, plot_variables[plot_var]['zmax'])
+            plotter.add_constraint(y_variable, '<=', plot_variables[plot_var]['zmax'])
+
+        # If plot_variables[plot_var]['_FillValue'] exists, set a constraint to prevent plotting _FillValues when not
+        # defined in the data set
+        if '_FillValue' in plot_variables[plot_var]:
+            logging.info('Setting _FillValue constraint: %s', plot_variables[plot_var]['_FillValue'])
+            plotter.add_constraint(plot_var, '!=', plot_variables[plot_var]['_FillValue'])
+
+        # Set the color bar with color bar name, min and max values
+        plot_var_colorbar = plot_variables[plot_var].get('colorbar', default_colorbar)
+        plotter.set_color_bar(plot_var_colorbar, min_value=cmin, max_value=cmax)
+
+        # Add constraint to NOT plot NaN values
+        plotter.add_constraint(plot_var, '!=', 'NaN')
+
+        logging.info('Creating url...')
+        image_url = plotter.build_image_request(x_variable, y_variable, plot_var)
+        if not image_url:
+            continue
+
+        # Print the url but do not queue the request
+        if debug:
+            logging.info('URL: %s', image_url)
+            logging.info('Skipping request (-x)')
+            continue
+
+        download_jobs.append((image_url, image_name))
+
+    return download_jobs
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+
+"""Convert a YAML configuration file to its JSON equivalent.
+
+The erddapgraph plot options loader prefers a .json artifact next to the
+shipped tabledap-options.yml since the stdlib json parser is an order of
+magnitude faster than YAML parsing.  Re-run this script whenever the YAML
+source is edited:
+
+    python tools/yaml_to_json.py config/tabledap-options.yml
+"""
+
+import argparse
+import json
+import os
+import sys
+import yaml
+
+
+def main(args):
+    yaml_file = args.yaml_file
+    json_file = args.json_file or os.path.splitext(yaml_file)[0] + '.json'
+
+    with open(yaml_file, 'r') as fid:
+        parsed = yaml.safe_load(fid)
+
+    with open(json_file, 'w') as fid:
+        json.dump(parsed, fid, indent=2)
+
+    sys.stdout.write('{:}\n'.format(json_file))
+
+    return 0
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description=main.__doc__)
+
+    arg_parser.add_argument('yaml_file',
+                            help='YAML file to convert')
+
+    arg_parser.add_argument('-o', '--json_file',
+                            help='Destination JSON file <Default=YAML file with a .json extension>')
+
+    parsed_args = arg_parser.parse_args()
+
+    sys.exit(main(parsed_args))